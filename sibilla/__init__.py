@@ -20,9 +20,16 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import datetime
+import decimal
+import queue
+import threading
+import weakref
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from typing import Any, Generator
 
+import cachetools
 import cx_Oracle
 
 
@@ -53,6 +60,16 @@ class IdentifierError(DatabaseError):
     """SQL identifier error."""
     pass
 
+
+class CallTimeoutError(DatabaseError):
+    """Database call timed out."""
+    pass
+
+
+class CallCancelledError(DatabaseError):
+    """Database call cancelled."""
+    pass
+
 class CursorRowError(SibillaError):
     """Cursor row wrapper error."""
     pass
@@ -61,6 +78,60 @@ class CursorRowError(SibillaError):
 # ---- Local helpers ----------------------------------------------------------
 
 
+# Bounds of the adaptive array size
+_MIN_ARRAYSIZE = 16
+_MAX_ARRAYSIZE = 10000
+
+# Estimated row widths of the statements fetched with the adaptive array
+# size, by connection and statement text
+_row_widths = cachetools.LRUCache(maxsize=1024)
+_row_widths_lock = threading.Lock()
+
+# Estimated size of the columns that are fetched as locators
+_LOCATOR_SIZE = 128
+
+
+def _row_width(description):
+    """Estimate the size in bytes of a row with the given description."""
+    return sum(
+        _LOCATOR_SIZE if c[1] in (
+            cx_Oracle.DB_TYPE_BLOB, cx_Oracle.DB_TYPE_CLOB,
+            cx_Oracle.DB_TYPE_NCLOB, cx_Oracle.DB_TYPE_BFILE
+        ) else max(c[3] or c[2] or 0, 8)
+        for c in description
+    )
+
+
+def _call_error(e, db=None):
+    """Map a cx_Oracle timeout or cancellation error to a Sibilla error.
+
+    When a timeout leaves the connection unusable, the given database
+    session, if any, is marked as such, so that it is dropped from its pool
+    when released (see :func:`sibilla.pool.SessionPool.release`). Returns
+    ``None`` if the error is neither.
+    """
+    error = e.args[0] if e.args else e
+    message = getattr(error, "message", str(error))
+    code = getattr(error, "code", None)
+
+    if message.startswith("DPI-1080"):
+        if db is not None:
+            db._unusable = True
+        return CallTimeoutError(message)
+    if code == 3156 or message.startswith("DPI-1067"):
+        return CallTimeoutError(message)
+    if code == 1013:
+        return CallCancelledError(message)
+
+    return None
+
+
+def _database_error(e, default=DatabaseError, db=None):
+    """Map a cx_Oracle error to a Sibilla error, of type default if it is
+    neither a timeout nor a cancellation."""
+    return _call_error(e, db) or default(e)
+
+
 def sql_identifier(name: str) -> str:
     """Treat string as SQL identifier.
 
@@ -206,10 +277,116 @@ class CursorRow(RowWrapper):
         return self._values
 
 
+class Collection(tuple):
+    """A collection of values to be bound as a single SQL collection.
+
+    Bind variables of this type are converted into instances of the
+    ``SYS.ODCINUMBERLIST``, ``SYS.ODCIVARCHAR2LIST`` or ``SYS.ODCIDATELIST``
+    collection types, according to the type of the values, when passed to any
+    of the :class:`Database` methods that execute statements. This allows
+    matching a column against an arbitrary number of values with a statement
+    whose text does not depend on the number of values.
+
+    Example:
+        >>> db.fetch_all(
+        ...     "select * from customer "
+        ...     "where id in (select column_value from table(:ids))",
+        ...     ids=Collection([1, 2, 3])
+        ... )
+    """
+
+    __types__ = [
+        ((int, float, decimal.Decimal), "SYS.ODCINUMBERLIST"),
+        ((str,), "SYS.ODCIVARCHAR2LIST"),
+        ((datetime.date,), "SYS.ODCIDATELIST"),
+    ]
+
+    @property
+    def type_name(self):
+        """The name of the SQL collection type for the values."""
+        for types, type_name in self.__types__:
+            if all(
+                v is None or (isinstance(v, types) and not isinstance(v, bool))
+                for v in self
+            ):
+                return type_name
+
+        raise DatabaseError(
+            "Cannot bind values of mixed or unsupported types as a collection."
+        )
+
+
+class FetchHandle:
+    """A cancellable iterator over the rows of an in-flight fetch.
+
+    Instances of this class are returned by the ``fetch_all`` methods when
+    called with ``cancellable=True``. The fetch can be cancelled from any
+    other thread with :func:`cancel`, in which case the iteration stops with
+    a :class:`CallCancelledError`. Since the cancellation is performed with
+    :func:`cx_Oracle.Connection.cancel`, any other call in progress on the
+    same connection is cancelled too.
+
+    Example:
+        >>> rows = db.customer.fetch_all(cancellable=True)
+        >>> threading.Timer(5, rows.cancel).start()
+        >>> for row in rows:
+        ...     process(row)
+    """
+
+    def __init__(self, db, cursor, rows):
+        self._db = db
+        self._cursor = cursor
+        self._rows = iter(rows)
+        self._cancelled = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._cancelled:
+            self.close()
+            raise CallCancelledError("The fetch has been cancelled.")
+
+        return next(self._rows)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def derive(self, func):
+        """Create a handle on the same fetch over the rows returned by
+        ``func`` when called with the iterator over the rows of this one."""
+        return type(self)(self._db, self._cursor, func(self._rows))
+
+    def cancel(self):
+        """Cancel the fetch."""
+        self._cancelled = True
+        self._db.cancel()
+
+    def close(self):
+        """Stop the fetch and close the cursor."""
+        close = getattr(self._rows, "close", None)
+        if close:
+            close()
+
+        if self._cursor is not None:
+            Database._close(self._cursor)
+
+    @property
+    def cancelled(self):
+        """Whether the fetch has been cancelled."""
+        return self._cancelled
+
+
 # -----------------------------------------------------------------------------
 
 
+from sibilla.caching import ResultCache
 from sibilla.object import ObjectLookup, ObjectType
+from sibilla.session import Session
+from sibilla.snapshot import Snapshot
 
 
 class Database(cx_Oracle.Connection):
@@ -309,6 +486,8 @@ class Database(cx_Oracle.Connection):
 
     __row_wrapper__ = CursorRow
 
+    __fetch_budget__ = 4 * 1024 * 1024
+
     def __init__(self, *args, **kwargs):
         """``Database`` constructor.
 
@@ -321,11 +500,17 @@ class Database(cx_Oracle.Connection):
         attribute. The user is in charge of `flushing` caches when objects in
         the database change and the new state is to be retrieved. For more
         details about cache objects see :class:`sibilla.caching.Cached`.
+        Query results of data sets that opt in are cached in
+        ``result_cache`` (see :class:`sibilla.caching.ResultCache`), which is
+        flushed at the end of every transaction.
 
         The initialisation is completed with a call to
         ``SYS.DBMS_OUTPUT.ENABLE`` so that any text output generated with calls
         to, e.g. ``SYS.DBMS_OUTPUT.PUT_LINE`` can be retrieved with the
-        ``get_output`` method.
+        ``get_output`` method. Sessions acquired from a
+        :class:`sibilla.pool.SessionPool` are enabled by the pool when they
+        are created, and build their ``ObjectLookup`` on first use, so that
+        acquiring them is cheap.
         """
         try:
             super().__init__(*args, **kwargs)
@@ -341,11 +526,20 @@ class Database(cx_Oracle.Connection):
 
             raise DatabaseError(msg) from e
 
-        self._default_lookup = ObjectLookup(self)
-        self.cache = self._default_lookup.cache
+        self._unusable = False
+        self._default_lookup = None
+        self._lookup_lock = threading.Lock()
+        self._pool = kwargs.get("pool")
+        self._units = threading.local()
+        self._snapshots = threading.local()
+        self._transaction_hooks = weakref.WeakSet()
+        self._prepared = weakref.WeakKeyDictionary()
+        self.result_cache = ResultCache()
+        self._collection_types = {}
 
         # Enable standard streams
-        self.dbms_output.enable()
+        if self._pool is None:
+            self.dbms_output.enable()
 
     def __getattr__(self, name):
         return getattr(self.__lookup__, name, None)
@@ -414,7 +608,9 @@ class Database(cx_Oracle.Connection):
             text += "\n"
         return text
 
-    def fetch_one(self, stmt: str, *args, **kwargs) -> Any:
+    def fetch_one(
+        self, stmt: str, *args, call_timeout: float=None, **kwargs
+    ) -> Any:
         """Fetch a single row from the execution of the provided statement.
 
         Bind variables can be provided both as positional and as keyword
@@ -423,14 +619,16 @@ class Database(cx_Oracle.Connection):
         Args:
             stmt (str): The statement to execute.
             *args: Variable length argument list for positional bind variables.
+            call_timeout (float): The timeout of the call, in seconds.
             **kwargs: Arbitrary keyword arguments for named bind variables.
 
         Returns:
             `object`: An instance of the ``__row_rapper__`` class if not
                 ``None`` or `tuple` otherwise.
         """
-        cursor = self.plsql(stmt, *args, **kwargs)
-        res = cursor.fetchone()
+        with self.call_timeout(call_timeout):
+            cursor = self.plsql(stmt, *args, **kwargs)
+            res = self._fetch(cursor, cursor.fetchone)
 
         if not self.__row_wrapper__:
             return res
@@ -438,15 +636,51 @@ class Database(cx_Oracle.Connection):
         return self.__row_wrapper__(cursor, res) if res else None
 
 
-    def fetch_all(self, stmt: str, *args, **kwargs) -> Generator[Any, None, None]:
+    def fetch_all(
+        self, stmt: str, *args, prefetch: int=None, arraysize=None,
+        prefetchrows: int=None, call_timeout: float=None,
+        cancellable: bool=False, **kwargs
+    ) -> Generator[Any, None, None]:
         """Fetch all rows from the execution of the provided statement.
 
         Bind variables can be provided both as positional and as keyword
         arguments to this method.
 
+        With ``prefetch``, the rows are fetched by a background thread, in
+        batches of ``arraysize`` rows and up to ``prefetch`` batches ahead of
+        the caller, so that fetching overlaps with the processing of the rows.
+        The background thread is stopped and the cursor is closed when the
+        returned generator is exhausted or closed. If the connection is used
+        by the caller while the rows are being prefetched, the database must
+        be created with ``threaded=True``.
+
+        The size of the batches can be set with ``arraysize``, and the number
+        of rows fetched with the execution with ``prefetchrows`` (see
+        :func:`plsql`). With ``arraysize="auto"``, the size is determined
+        before the execution from the description of the query, the estimated
+        size of the rows and the fetch memory budget (see
+        :func:`set_fetch_budget`). The description is retrieved once for each
+        statement.
+
+        With ``call_timeout``, the execution of the statement and each round
+        trip to fetch the rows must complete within the given number of
+        seconds, or :class:`CallTimeoutError` is raised (see
+        :func:`call_timeout`). The timeout is set on the connection around
+        each round trip, so with ``prefetch`` it also applies to any call
+        that the caller makes on the connection while a batch is being
+        fetched. With ``cancellable``, the rows are returned by
+        a :class:`FetchHandle`, which can be used to cancel the fetch.
+
         Args:
             stmt (str): The statement to execute.
             *args: Variable length argument list for positional bind variables.
+            prefetch (int): The number of batches to fetch ahead.
+            arraysize (int): The number of rows to fetch with each round trip,
+                or ``"auto"``.
+            prefetchrows (int): The number of rows to fetch with the
+                execution of the statement.
+            call_timeout (float): The timeout of each call, in seconds.
+            cancellable (bool): Whether to return a :class:`FetchHandle`.
             **kwargs: Arbitrary keyword arguments for named bind variables.
 
         Returns:
@@ -454,17 +688,155 @@ class Database(cx_Oracle.Connection):
                 provided statement, either wrapped in ``__row_wrapper__`` if
                 not ``None`` or as ``tuple`` s otherwise.
         """
-        cursor = self.plsql(stmt, *args, **kwargs)
+        if arraysize == "auto":
+            # The fetch buffer is allocated on execution, so the array size
+            # must be determined before.
+            arraysize = self._describe_arraysize(stmt)
+
+        cursor = self.plsql(
+            stmt, *args, arraysize=arraysize, prefetchrows=prefetchrows,
+            call_timeout=call_timeout, **kwargs
+        )
 
-        if not self.__row_wrapper__:
-            return cursor
+        if prefetch:
+            rows = self._prefetch(cursor, prefetch, call_timeout)
+        elif call_timeout or cancellable or self.callTimeout:
+            # Fetch the rows in batches so that timeouts and cancellations
+            # are reported as such.
+            rows = self._wrap_batches(
+                cursor, self._batches(cursor, call_timeout)
+            )
+        elif not self.__row_wrapper__:
+            rows = cursor
+        else:
+            rows = self.__row_wrapper__.from_cursor(cursor)
+
+        return FetchHandle(self, cursor, rows) if cancellable else rows
+
+    @staticmethod
+    def _fetch(cursor, fetch, *args):
+        # Fetch rows from the cursor, closing it if the fetch fails so that
+        # the session can be reused.
+        try:
+            return fetch(*args)
+        except cx_Oracle.DatabaseError as e:
+            db = cursor.connection
+            Database._close(cursor)
+            raise _database_error(e, db=db) from e
 
-        return self.__row_wrapper__.from_cursor(cursor)
+    @staticmethod
+    def _close(cursor):
+        try:
+            cursor.close()
+        except cx_Oracle.Error:
+            pass  # Already closed
+
+    def _describe_arraysize(self, stmt):
+        # The largest array size whose rows fit the fetch budget, from the
+        # description of the query. The row width is memoized, as parsing
+        # the statement takes a round trip.
+        key = (self.dsn, self.username, stmt)
+        with _row_widths_lock:
+            width = _row_widths.get(key, -1)
+
+        if width == -1:
+            with self.cursor() as cursor:
+                try:
+                    cursor.parse(stmt)
+                except cx_Oracle.DatabaseError as e:
+                    raise _database_error(e) from e
+
+                width = (
+                    _row_width(cursor.description)
+                    if cursor.description else None
+                )
+
+            with _row_widths_lock:
+                _row_widths[key] = width
 
-    def _fetch_many(self, stmt: str, n: int, *args, **kwargs) -> tuple:
+        if width is None:
+            return None
+
+        return min(
+            max(self.__fetch_budget__ // (width or 1), _MIN_ARRAYSIZE),
+            _MAX_ARRAYSIZE
+        )
+
+    def _batches(self, cursor, call_timeout=None):
+        # Fetch the rows of the cursor in batches of arraysize rows.
+        while True:
+            with self.call_timeout(call_timeout):
+                rows = self._fetch(cursor, cursor.fetchmany)
+
+            if not rows:
+                return
+
+            yield rows
+
+    def _wrap_batches(self, cursor, batches):
+        try:
+            for rows in batches:
+                if self.__row_wrapper__:
+                    rows = self.__row_wrapper__.from_list(cursor, rows)
+                yield from rows
+        finally:
+            self._close(cursor)
+
+    def _prefetch(self, cursor, depth, call_timeout=None):
+        # Fetch the rows of the cursor in a background thread, keeping up to
+        # depth batches in a bounded buffer.
+        batches = queue.Queue(maxsize=depth)
+        stop = threading.Event()
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    pass
+
+        def read():
+            try:
+                for rows in self._batches(cursor, call_timeout):
+                    if stop.is_set():
+                        return
+                    put(rows)
+                put([])
+            except Exception as e:
+                put(e)
+
+        # The timeout is only set by the reader around its fetches, so that
+        # it does not outlast them.
+        reader = threading.Thread(target=read, daemon=True)
+        reader.start()
+
+        try:
+            while True:
+                rows = batches.get()
+                if isinstance(rows, Exception):
+                    raise rows
+                if not rows:
+                    return
+
+                if self.__row_wrapper__:
+                    rows = self.__row_wrapper__.from_list(cursor, rows)
+                yield from rows
+        finally:
+            stop.set()
+            reader.join()
+            self._close(cursor)
+
+    def _fetch_many(
+        self, stmt: str, n: int, *args, call_timeout: float=None, **kwargs
+    ) -> tuple:
         # Required to break cyclic dependencies leading to infinite recursion.
-        cursor = self.plsql(stmt, *args, **kwargs)
-        return cursor, cursor.fetchmany(n)
+        # The n rows are fetched with a single round trip, unless a different
+        # array size is requested.
+        kwargs.setdefault("arraysize", max(min(n, _MAX_ARRAYSIZE), 1))
+        with self.call_timeout(call_timeout):
+            cursor = self.plsql(stmt, *args, **kwargs)
+            return cursor, self._fetch(cursor, cursor.fetchmany, n)
 
     def fetch_many(self, stmt: str, n: int, *args, **kwargs) -> list:
         """Fetch (at most) `n` rows from the given query.
@@ -476,6 +848,7 @@ class Database(cx_Oracle.Connection):
             stmt (str): The statement to execute.
             n (int): The number of rows to fetch.
             *args: Variable length argument list for positional bind variables.
+            call_timeout (float): The timeout of the call, in seconds.
             **kwargs: Arbitrary keyword arguments for named bind variables.
 
         Returns:
@@ -491,7 +864,10 @@ class Database(cx_Oracle.Connection):
         return self.__row_wrapper__.from_list(cursor, data)
 
     # TODO: Batch execute: https://blogs.oracle.com/opal/efficient-and-scalable-batch-statement-execution-in-python-cx_oracle
-    def plsql(self, stmt: str, *args, batch: list=None, **kwargs):
+    def plsql(
+        self, stmt: str, *args, batch: list=None, arraysize=None,
+        prefetchrows: int=None, call_timeout: float=None, **kwargs
+    ):
         """Execute (PL/)SQL code.
 
         Bind variables can be provided both as positional and as keyword
@@ -502,11 +878,22 @@ class Database(cx_Oracle.Connection):
         different values, the ``batch`` argument should be used instead of
         implementing a loop in Python in order to improve performance.
 
+        The number of rows fetched from the returned cursor with each round
+        trip can be tuned with ``arraysize`` and ``prefetchrows`` (see the
+        attributes of :class:`cx_Oracle.Cursor` with the same names).
+
+        The execution can be bounded with ``call_timeout`` (see
+        :func:`call_timeout`). If the execution fails, the cursor is closed.
+
         Args:
             stmt (str): The (PL/)SQL statement to execute.
             *args: Variable length argument list for positional bind variables.
             batch (list): A list of bind variables in the form of tuples to
                 use iteratively with the given (PL/)SQL statement.
+            arraysize (int): The number of rows to fetch with each round trip.
+            prefetchrows (int): The number of rows to fetch with the
+                execution of the statement.
+            call_timeout (float): The timeout of the execution, in seconds.
             **kwargs: Arbitrary keyword arguments for named bind variables.
 
         Returns:
@@ -523,22 +910,94 @@ class Database(cx_Oracle.Connection):
                 "batch."
             )
 
+        cursor = None
         try:
             cursor = self.cursor()
+            if isinstance(arraysize, int):
+                cursor.arraysize = arraysize
+            if prefetchrows is not None:
+                cursor.prefetchrows = prefetchrows
+
+            args = [self._bind(v) for v in args]
+            kwargs = {k: self._bind(v) for k, v in kwargs.items()}
 
             # TODO: executemany doesn't support generators yet.
             #       See https://github.com/oracle/python-cx_Oracle/issues/200
-            if batch:
-                cursor.executemany(stmt, batch)
-            elif kwargs:
-                cursor.execute(stmt, **kwargs)
-            else:
-                cursor.execute(stmt, args)
+            with self.call_timeout(call_timeout):
+                if batch:
+                    cursor.executemany(stmt, batch)
+                elif kwargs:
+                    cursor.execute(stmt, **kwargs)
+                else:
+                    cursor.execute(stmt, args)
 
             return cursor
 
         except cx_Oracle.DatabaseError as e:
-            raise DatabaseError(e) from e
+            if cursor is not None:
+                self._close(cursor)
+            raise _database_error(e, db=self) from e
+
+    def _bind(self, value):
+        # Convert collections into SQL collection objects
+        if not isinstance(value, Collection):
+            return value
+
+        type_name = value.type_name
+        try:
+            collection_type = self._collection_types[type_name]
+        except KeyError:
+            collection_type = self._collection_types[type_name] = \
+                self.gettype(type_name)
+
+        return collection_type.newobject(list(value))
+
+    @contextmanager
+    def call_timeout(self, seconds: float):
+        """Bound the duration of the database calls within a context.
+
+        Any round trip to the database that does not complete within the
+        given number of seconds is interrupted, and raises a
+        :class:`CallTimeoutError`. The previous timeout is restored on exit.
+        With ``None``, the timeout is left unchanged.
+
+        Example:
+            >>> with db.call_timeout(5):
+            ...     db.pkg.slow_func()
+
+        Args:
+            seconds (float): The timeout of each call.
+        """
+        if seconds is None:
+            yield
+            return
+
+        previous = self.callTimeout
+        self.callTimeout = int(seconds * 1000)
+        try:
+            yield
+        finally:
+            self.callTimeout = previous
+
+    def set_call_timeout(self, seconds: float):
+        """Set the timeout of all the database calls.
+
+        Any round trip to the database, including the calls to stored
+        functions and procedures, that does not complete within the given
+        number of seconds is interrupted, and raises a
+        :class:`CallTimeoutError`. Set to ``None`` to disable the timeout,
+        which is the default.
+        """
+        self.callTimeout = int((seconds or 0) * 1000)
+
+    def set_fetch_budget(self, size):
+        """Set the memory budget of adaptive fetches.
+
+        Fetches with ``arraysize="auto"`` (see :func:`fetch_all`) fetch as
+        many rows with each round trip as their estimated size allows within
+        the given budget, in bytes. The default budget is 4 MB.
+        """
+        self.__fetch_budget__ = size
 
     def set_scope(self, scope):
         """Set the Oracle Data Dictionary scope.
@@ -581,12 +1040,57 @@ class Database(cx_Oracle.Connection):
             else var_type
         )
 
+    def session(self) -> Session:
+        """Create a new unit of work.
+
+        Changes to table rows made within a session are tracked and written
+        to the database in batches on flush or commit. When used as a context
+        manager, the session is committed on exit, or rolled back if an
+        exception is raised. See :class:`sibilla.session.Session` for more
+        details.
+
+        Returns:
+            :class:`sibilla.session.Session`: a new session on the database.
+        """
+        return Session(self)
+
+    def snapshot(self, scn=None) -> Snapshot:
+        """Create a read-consistent snapshot of the database.
+
+        Queries generated by data sets within the snapshot, from the same
+        thread, see the data as of the given system change number, or as of
+        the current one by default. See :class:`sibilla.snapshot.Snapshot` for
+        more details.
+
+        Args:
+            scn (int): The system change number of the snapshot.
+
+        Returns:
+            :class:`sibilla.snapshot.Snapshot`: the snapshot.
+        """
+        return Snapshot(self, scn)
+
     def commit(self, flush_cache=True):
         super().commit()
+        self._end_transaction()
 
-        if flush_cache:
+        if flush_cache and self._default_lookup is not None:
             self.cache.flush()
 
+    def rollback(self):
+        super().rollback()
+        self._end_transaction()
+
+    def _on_transaction_end(self, obj):
+        # Register an object whose transaction-bound state must be discarded
+        # on commit and rollback.
+        self._transaction_hooks.add(obj)
+
+    def _end_transaction(self):
+        self.result_cache.flush()
+        for obj in list(self._transaction_hooks):
+            obj._end_transaction()
+
     # ---- Properties ---------------------------------------------------------
 
     @property
@@ -600,6 +1104,32 @@ class Database(cx_Oracle.Connection):
     def session_user(self, value):
         raise AttributeError("'session_user' is read-only.")
 
+    @property
+    def __pool__(self):
+        """The session pool the database session comes from, if any."""
+        return self._pool
+
+    @property
+    def __snapshot__(self):
+        """The SCN of the snapshot active in the current thread, if any."""
+        return getattr(self._snapshots, "scn", None)
+
+    @property
+    def __session__(self):
+        """The unit of work active in the current thread, if any."""
+        return getattr(self._units, "session", None)
+
+    @property
+    def __shared__(self):
+        """Whether the object is shared by sessions with different
+        transactions (see :class:`sibilla.pool.LocalDatabase`)."""
+        return False
+
+    @property
+    def cache(self):
+        """The cache of the looked-up objects."""
+        return self.__lookup__.cache
+
     @property
     def __lookup__(self):
         """Internal ``ObjectLookup`` for object discovery.
@@ -610,6 +1140,10 @@ class Database(cx_Oracle.Connection):
         dedicated to  the :class:`sibilla.object.ObjectLookup`` class for
         examples.
         """
+        if self._default_lookup is None:
+            with self._lookup_lock:
+                if self._default_lookup is None:
+                    self._default_lookup = ObjectLookup(self)
 
         return self._default_lookup
 
@@ -0,0 +1,260 @@
+# This file is part of "sibilla" which is released under GPL.
+#
+# See file LICENCE or go to http://www.gnu.org/licenses/ for full license
+# details.
+#
+# Sibilla is a Python ORM for the Oracle Database.
+#
+# Copyright (c) 2019 Gabriele N. Tornetta <phoenix1987@gmail.com>.
+# All rights reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import threading
+import types
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from sibilla import DatabaseError
+
+
+# ---- Exceptions -------------------------------------------------------------
+
+
+class AsyncDatabaseError(DatabaseError):
+    """Asynchronous database error."""
+    pass
+
+
+# ---- Classes ----------------------------------------------------------------
+
+
+class AsyncObject:
+    """Asynchronous proxy of a database object.
+
+    The proxy resolves attributes lazily, as the :class:`sibilla.Database`
+    look-up does, so that e.g. ``adb.customer.fetch_one`` or
+    ``adb.pkg.func`` give the proxies of the corresponding objects. Calling a
+    proxy returns a coroutine that resolves the object and calls it on a
+    worker thread of the :class:`AsyncDatabase`. Generators returned by the
+    call, like those of ``fetch_all``, are consumed on the worker thread and
+    returned as lists. Use :func:`afetch_all` to iterate over large results
+    asynchronously instead.
+    """
+
+    def __init__(self, adb, path):
+        self._adb = adb
+        self._path = path
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        return AsyncObject(self._adb, self._path + (name,))
+
+    def _resolve(self, db, *names):
+        obj = db
+        for name in self._path + names:
+            obj = getattr(obj, name)
+            if obj is None:
+                raise AsyncDatabaseError(
+                    "No object named {}".format(".".join(self._path + names))
+                )
+        return obj
+
+    async def __call__(self, *args, **kwargs):
+        def call(db):
+            result = self._resolve(db)(*args, **kwargs)
+            if isinstance(result, types.GeneratorType):
+                return list(result)
+            return result
+
+        return await self._adb._run(call, self._adb.timeout)
+
+    async def afetch_all(self, *args, batch_size=100, **kwargs):
+        """Iterate asynchronously over the rows of ``fetch_all``.
+
+        The rows are fetched ``batch_size`` at a time by a single worker
+        thread, on its own session, which is held for the whole iteration.
+        At most two batches are fetched ahead of the consumer.
+
+        Example:
+            >>> async for row in adb.orders.afetch_all(status="OPEN"):
+            ...     await process(row)
+        """
+        loop = asyncio.get_event_loop()
+        batches = asyncio.Queue()
+        credit = threading.Semaphore(2)
+        stop = threading.Event()
+
+        def produce(db):
+            rows = self._resolve(db, "fetch_all")(*args, **kwargs)
+            try:
+                while True:
+                    while not credit.acquire(timeout=0.1):
+                        if stop.is_set():
+                            return
+                    if stop.is_set():
+                        return
+
+                    batch = list(islice(rows, batch_size))
+                    loop.call_soon_threadsafe(batches.put_nowait, batch)
+                    if not batch:
+                        return
+            finally:
+                if hasattr(rows, "close"):
+                    rows.close()
+
+        producer = asyncio.ensure_future(self._adb._run(produce))
+        try:
+            while True:
+                get = asyncio.ensure_future(batches.get())
+                await asyncio.wait(
+                    [get, producer], return_when=asyncio.FIRST_COMPLETED
+                )
+                if not get.done():
+                    get.cancel()
+                    # Raise the error of the producer, if any, or wait for
+                    # its last batch.
+                    producer.result()
+                    batch = await batches.get()
+                else:
+                    batch = get.result()
+
+                credit.release()
+                if not batch:
+                    return
+
+                for row in batch:
+                    yield row
+        finally:
+            stop.set()
+            await asyncio.wait([producer])
+            if not producer.cancelled():
+                producer.exception()
+
+    def __repr__(self):
+        return "<async {}>".format(".".join(self._path) or "database")
+
+
+class AsyncDatabase(AsyncObject):
+    """Asynchronous database facade for asyncio applications.
+
+    Calls are run on a bounded pool of worker threads, each with its own
+    :class:`sibilla.Database` session acquired from the given
+    :class:`sibilla.pool.SessionPool`, so that the event loop is never
+    blocked. Since consecutive calls can run on different sessions, sessions
+    are in autocommit mode by default.
+
+    Database methods and objects are accessed as with a
+    :class:`sibilla.Database`, and calls are awaited.
+
+    Example:
+        >>> async with AsyncDatabase(pool) as adb:
+        ...     row = await adb.fetch_one("select sysdate from dual")
+        ...     customer = await adb.customer.fetch_one(id=42)
+        ...     answer = await adb.foo.bar(42)
+        ...     async for row in adb.orders.afetch_all(status="OPEN"):
+        ...         print(row.id)
+
+    Calls can be cancelled, e.g. with :func:`asyncio.wait_for`, in which case
+    the running statement is interrupted with
+    :func:`cx_Oracle.Connection.cancel`, and the session of the call is
+    replaced with a new one. A default deadline for every call can be set
+    with ``timeout``.
+
+    Args:
+        pool (:class:`sibilla.pool.SessionPool`): The session pool.
+        max_workers (int): The number of worker threads. Defaults to the
+            maximum number of sessions of the pool.
+        timeout (float): The default timeout of every call, in seconds.
+        autocommit (bool): Whether the sessions are in autocommit mode.
+    """
+
+    def __init__(self, pool, max_workers=None, timeout=None, autocommit=True):
+        super().__init__(self, ())
+
+        self.pool = pool
+        self.timeout = timeout
+        self.autocommit = autocommit
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or pool.max,
+            thread_name_prefix="sibilla-aio"
+        )
+        self._local = threading.local()
+        self._sessions = []
+        self._lock = threading.Lock()
+
+    def _session(self):
+        # The session of the current worker thread. A session left unusable
+        # by a timeout or a cancellation is dropped from the pool and
+        # replaced.
+        db = getattr(self._local, "db", None)
+        if db is not None and db._unusable:
+            self._local.db = None
+            with self._lock:
+                self._sessions.remove(db)
+            self.pool.release(db)
+            db = None
+
+        if db is None:
+            db = self._local.db = self.pool.acquire()
+            db.autocommit = self.autocommit
+            with self._lock:
+                self._sessions.append(db)
+
+        return db
+
+    async def _run(self, func, timeout=None):
+        loop = asyncio.get_event_loop()
+        running = []
+
+        def job():
+            db = self._session()
+            running.append(db)
+            try:
+                return func(db)
+            finally:
+                running.clear()
+
+        future = loop.run_in_executor(self._executor, job)
+        try:
+            if timeout is None:
+                return await future
+            return await asyncio.wait_for(future, timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            # Interrupt the statement in flight, if any. The cancellation can
+            # also hit the next call if this one has just completed, so the
+            # session is not reused.
+            for db in list(running):
+                db._unusable = True
+                db.cancel()
+            raise
+
+    async def close(self):
+        """Stop the worker threads and release their sessions."""
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, self._executor.shutdown)
+
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for db in sessions:
+            self.pool.release(db)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
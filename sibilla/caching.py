@@ -20,13 +20,17 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import sys
 import threading
+import time
 
 import cachetools
 
 # Default cache parameters
 _ttl = 60 * 60 * 24  # 1 day
 _max_size = 1024
+_identity_map_size = 1024
+_result_cache_size = 64 * 1024 * 1024  # 64 MB
 
 
 def set_ttl(ttl):
@@ -41,6 +45,23 @@ def set_maxsize(size):
     _max_size = size
 
 
+def set_identity_map_size(size):
+    """Set the maximum number of rows held by the identity map of a table.
+
+    A size of 0 disables the identity maps. Any other size only applies to
+    the identity maps created afterwards, i.e. those of the tables whose rows
+    have not been accessed by primary key yet.
+    """
+    global _identity_map_size
+    _identity_map_size = size
+
+
+def set_result_cache_size(size):
+    """Set the memory budget, in bytes, when creating result caches."""
+    global _result_cache_size
+    _result_cache_size = size
+
+
 def cachedmethod(f):
     """Caching decorator for class and instance methods."""
     return cachetools.cachedmethod(
@@ -52,13 +73,16 @@ def cachedmethod(f):
 class SynchronizedTTLCache(cachetools.TTLCache):
     """Implement a synchronised TTL cache."""
 
-    def __init__(self):
+    def __init__(self, maxsize=None):
         """Initialise the synchronised cache with the set parameters.
 
         The TTL and maximum size parameters are set at the module level and
-        can be changed with the provided setters.
+        can be changed with the provided setters. The maximum size can be
+        overridden with the ``maxsize`` argument.
         """
-        super().__init__(maxsize=_max_size, ttl=_ttl)
+        super().__init__(
+            maxsize=_max_size if maxsize is None else maxsize, ttl=_ttl
+        )
 
         self._lock = threading.RLock()
 
@@ -67,6 +91,12 @@ class SynchronizedTTLCache(cachetools.TTLCache):
         with self._lock:
             self.clear()
 
+    def discard(self, predicate):
+        """Discard the entries whose key satisfies the given predicate."""
+        with self._lock:
+            for key in [k for k in self.keys() if predicate(k)]:
+                del self[key]
+
 
 class Cached:
     """Cache mixin for adding synchronised TTL caching support to objects."""
@@ -81,3 +111,172 @@ class Cached:
         Call ``flush`` on ``cache`` to force a flush of the cache.
         """
         self.cache = cache or SynchronizedTTLCache()
+
+
+class IndexedStore:
+    """In-memory store of rows with hash indexes.
+
+    Rows are kept as plain tuples, together with the description of the
+    cursor they were fetched from. Hash indexes can be built on any set of
+    columns to answer equality look-ups without scanning all the rows. The
+    objects built from the rows, e.g. their wrappers, can be kept in
+    ``objects`` for the lifetime of the store.
+    """
+
+    def __init__(self, description, rows, indexes=None, ttl=None):
+        """Build the store and its indexes.
+
+        Args:
+            description (list): The description of the cursor the rows were
+                fetched from.
+            rows (list): The rows to store, as tuples.
+            indexes (list): The indexes to build, each given as a collection
+                of column names.
+            ttl (int): The time-to-live of the store, in seconds. By default,
+                the TTL set at the module level is used.
+        """
+        self.description = description
+        self.rows = rows
+        self.objects = {}
+
+        self._positions = {c[0]: i for i, c in enumerate(description)}
+        self._indexes = {}
+        self._expires = time.monotonic() + (ttl or _ttl)
+
+        for index in indexes or []:
+            columns = tuple(sorted(index))
+            positions = [self._positions[c] for c in columns]
+            entries = self._indexes[columns] = {}
+            for row in rows:
+                entries.setdefault(
+                    tuple(row[i] for i in positions), []
+                ).append(row)
+
+    @property
+    def expired(self):
+        """Whether the store has outlived its TTL."""
+        return time.monotonic() > self._expires
+
+    def lookup(self, values):
+        """Find the rows with the given column values.
+
+        An index on the exact set of given columns is used if available.
+        Otherwise the rows are scanned.
+
+        Args:
+            values (dict): The column values to match.
+
+        Returns:
+            list: the matching rows.
+        """
+        columns = tuple(sorted(values))
+        key = tuple(values[c] for c in columns)
+
+        try:
+            return list(self._indexes[columns].get(key, []))
+        except KeyError:
+            pass
+
+        positions = [self._positions[c] for c in columns]
+        return [
+            row for row in self.rows
+            if tuple(row[i] for i in positions) == key
+        ]
+
+
+def _sizeof_result(result):
+    """Estimate the memory used by a query result."""
+    _, rows = result
+    return sys.getsizeof(rows) + sum(
+        sys.getsizeof(row) + sum(sys.getsizeof(v) for v in row)
+        for row in rows
+    )
+
+
+class _LRUCache(cachetools.LRUCache):
+    """LRU cache that reports the keys it evicts."""
+
+    def __init__(self, maxsize, getsizeof, on_evict):
+        super().__init__(maxsize=maxsize, getsizeof=getsizeof)
+        self._on_evict = on_evict
+
+    def popitem(self):
+        key, value = super().popitem()
+        self._on_evict(key)
+        return key, value
+
+
+class ResultCache:
+    """Synchronised LRU cache of query results.
+
+    Results are stored as the description of the cursor they were fetched
+    from, together with the raw rows, and are tagged with the name of the
+    object they have been fetched from, so that they can be invalidated
+    selectively. The least recently used results are evicted as soon as the
+    estimated memory usage exceeds the budget, which is set at the module
+    level and can be changed with :func:`set_result_cache_size`.
+    """
+
+    def __init__(self, maxsize=None):
+        self._cache = _LRUCache(
+            maxsize=maxsize or _result_cache_size,
+            getsizeof=_sizeof_result,
+            on_evict=self._untag
+        )
+        self._tags = {}
+        self._keys = {}
+        self._lock = threading.RLock()
+
+    def _untag(self, key):
+        # Forget the tag of a key that is no longer in the cache
+        tag = self._keys.pop(key, None)
+        keys = self._tags.get(tag)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._tags[tag]
+
+    def get(self, key):
+        """Get the cached result for the given key, if any.
+
+        Returns:
+            tuple: the cursor description and the list of raw rows, or
+                ``None`` if the result is not in the cache.
+        """
+        with self._lock:
+            return self._cache.get(key)
+
+    def put(self, tag, key, description, rows):
+        """Store a query result.
+
+        Results that do not fit in the memory budget are not stored.
+        """
+        with self._lock:
+            try:
+                self._cache[key] = (description, rows)
+            except ValueError:
+                # Too large
+                return
+
+            self._untag(key)
+            self._keys[key] = tag
+            self._tags.setdefault(tag, set()).add(key)
+
+    def invalidate(self, tag):
+        """Discard all the results with the given tag."""
+        with self._lock:
+            for key in self._tags.pop(tag, []):
+                self._keys.pop(key, None)
+                self._cache.pop(key, None)
+
+    def flush(self):
+        """Flush the cache."""
+        with self._lock:
+            self._cache.clear()
+            self._tags.clear()
+            self._keys.clear()
+
+    @property
+    def currsize(self):
+        """The estimated memory usage of the cache, in bytes."""
+        return self._cache.currsize
@@ -20,9 +20,19 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import queue
+import threading
+import weakref
 from functools import update_wrapper
+from types import SimpleNamespace
 
-from sibilla import CursorRow, DatabaseError
+import cachetools
+import cx_Oracle
+
+from sibilla import (
+    _MAX_ARRAYSIZE, Collection, CursorRow, DatabaseError, FetchHandle,
+    sql_identifier
+)
 from sibilla.caching import Cached, cachedmethod
 from sibilla.object import OracleObject
 
@@ -115,6 +125,10 @@ class Row(Cached):
 
         return res[0]
 
+    def _set_record(self, record):
+        self.__kwargs = record
+        self.cache.flush()
+
     @property
     def db(self):
         """Get the underlying database."""
@@ -184,44 +198,216 @@ def rowattribute(func):
 # -----------------------------------------------------------------------------
 
 
-def _generate_where_statement(e, binds, op=None):
-    def generate_condition(k, v):
-        key = k+str(len(binds))
-        binds[key] = v
-
-        return '{} {} {}'.format(
-            k,
-            'like' if isinstance(v, str) and '%' in v else '=',
-            ":" + key
-        )
+# Operators that can be appended to column names in where clauses, e.g.
+# ``amount__gt``.
+_COMPARISON_OPERATORS = {
+    "eq": "=",
+    "ne": "!=",
+    "lt": "<",
+    "le": "<=",
+    "gt": ">",
+    "ge": ">=",
+    "like": "like",
+    "notlike": "not like",
+}
 
-    def group(s):
-        return "(" + s + ")"
+_OPERATORS = set(_COMPARISON_OPERATORS) | {"in", "notin", "between", "isnull"}
+
+# Maximum number of values bound with a single collection
+_COLLECTION_CHUNK_SIZE = 32767
+
+# Bind variable for the SCN of flashback queries
+_SNAPSHOT_BIND = "sibilla_scn"
+
+# Generated select statements, by query shape
+_statement_cache = cachetools.LRUCache(maxsize=1024)
+_statement_cache_lock = threading.Lock()
+
+
+def _split_operator(k):
+    """Split a where clause key into its column name and operator.
+
+    The operator is ``None`` if the key is a plain column name.
+    """
+    column, _, op = k.rpartition("__")
+
+    return (column, op) if column and op in _OPERATORS else (k, None)
+
+
+def _resolve_condition(k, v):
+    """Resolve a where condition into its shape and its bind values.
+
+    The shape of a condition determines the SQL text generated for it, while
+    the bind values are the values to bind to the variables it introduces.
+    """
+    column, op = _split_operator(k)
 
+    if op is None:
+        if isinstance(v, (list, set, frozenset)):
+            op = "in"
+        else:
+            op = "like" if isinstance(v, str) and '%' in v else "eq"
+
+    if op in _COMPARISON_OPERATORS:
+        return (column, op), [v]
+
+    if op == "isnull":
+        return (column, op, bool(v)), []
+
+    if op == "between":
+        try:
+            low, high = v
+        except (TypeError, ValueError):
+            raise QueryError(
+                "Expected a pair of values for {}, got {}".format(k, repr(v))
+            )
+        return (column, op), [low, high]
+
+    # IN and NOT IN lists are bound as collections, so that the statement
+    # does not depend on the number of values. Large lists are split into
+    # chunks.
+    values = list(v) if isinstance(v, (list, tuple, set, frozenset)) else [v]
+    chunks = [
+        Collection(values[i:i + _COLLECTION_CHUNK_SIZE])
+        for i in range(0, len(values), _COLLECTION_CHUNK_SIZE)
+    ]
+
+    return (column, op, len(chunks)), chunks
+
+
+def _resolve_where(e):
+    """Resolve a where clause into its shape and its bind values.
+
+    Where clauses with the same shape generate the same SQL text. The bind
+    values are listed in the same order as the bind variables in the text.
+    """
     if isinstance(e, str):
-        return e
+        return e, []
+
+    values = []
 
     if isinstance(e, dict):
+        shape = []
+        for k, v in e.items():
+            condition, condition_values = _resolve_condition(k, v)
+            shape.append(condition)
+            values += condition_values
+
+        return ("dict", tuple(shape)), values
+
+    if isinstance(e, (list, tuple)):
+        shape = []
+        for i in e:
+            item_shape, item_values = _resolve_where(i)
+            shape.append(item_shape)
+            values += item_values
+
+        return ("or" if isinstance(e, list) else "and", tuple(shape)), values
+
+    raise QueryError("Invalid where clause: {}".format(repr(e)))
+
+
+def _compile_condition(shape, names):
+    def bind():
+        # Qualified column names, e.g. in joins, are bound by column name
+        key = column.rpartition(".")[2] + str(len(names))
+        names.append(key)
+        return ":" + key
+
+    column, op = shape[:2]
+
+    if op in _COMPARISON_OPERATORS:
+        return '{} {} {}'.format(column, _COMPARISON_OPERATORS[op], bind())
+
+    if op == "isnull":
+        return '{} is {}null'.format(column, "" if shape[2] else "not ")
+
+    if op == "between":
+        return '{} between {} and {}'.format(column, bind(), bind())
+
+    if not shape[2]:
+        return "1=0" if op == "in" else "1=1"
+
+    return "(" + (" or " if op == "in" else " and ").join(
+        "{} {} (select column_value from table({}))".format(
+            column, "in" if op == "in" else "not in", bind()
+        ) for _ in range(shape[2])
+    ) + ")"
+
+
+def _compile_where(shape, names, op=None):
+    """Compile the shape of a where clause into SQL text.
+
+    The names of the bind variables are appended to ``names``, in order.
+    """
+    def group(s):
+        return "(" + s + ")"
+
+    if isinstance(shape, str):
+        return shape
+
+    kind, items = shape
+
+    if kind == "dict":
         if op is None:
             raise QueryError("Invalid where clause")
 
         return group(
-            op.join(generate_condition(k, v) for k, v in e.items())
+            op.join(_compile_condition(c, names) for c in items)
         )
 
-    if isinstance(e, list):
-        return group(
-            " or ".join(
-                [_generate_where_statement(i, binds, " or ") for i in e]
-            )
-        )
+    op = " or " if kind == "or" else " and "
+    return group(
+        op.join([_compile_where(i, names, op) for i in items])
+    )
+
+
+def _generate_where_statement(e, binds, op=None):
+    shape, values = _resolve_where(e)
+    names = [None] * len(binds)
+    statement = _compile_where(shape, names, op)
+    binds.update(zip(names[len(binds):], values))
+
+    return statement
+
+
+def _generate_hints(hints, table):
+    for hint in hints:
+        if "*/" in hint:
+            raise QueryError("Invalid hint: {}".format(hint))
+
+    return "/*+ {} */ ".format(
+        " ".join(hint.replace("{table}", table) for hint in hints)
+    ) if hints else ""
+
+
+class Hint:
+    """Optimizer hints.
+
+    Hints can be passed to the ``fetch_*`` methods of :class:`DataSet` objects,
+    or set on a data set class with :func:`DataSet.set_hints`, as plain
+    strings, e.g. ``"PARALLEL(4)"``. This class provides some helpers for the
+    most common ones.
+    """
+
+    RESULT_CACHE = "RESULT_CACHE"
+    NO_RESULT_CACHE = "NO_RESULT_CACHE"
+
+    @staticmethod
+    def parallel(degree=None):
+        """Parallel query hint, with an optional degree of parallelism."""
+        return "PARALLEL({})".format(degree) if degree else "PARALLEL"
+
+    @staticmethod
+    def index(*indexes):
+        """Index access hint on the given indexes of the data set."""
+        return "INDEX({{table}} {})".format(" ".join(indexes))
+
+    @staticmethod
+    def first_rows(n):
+        """Optimise for the retrieval of the first ``n`` rows."""
+        return "FIRST_ROWS({})".format(int(n))
 
-    if isinstance(e, tuple):
-        return group(
-            " and ".join(
-                [_generate_where_statement(i, binds, " and ") for i in e]
-            )
-        )
 
 # def where_statement_from_kwargs(kwargs):
 #     return ' and '.join(
@@ -246,12 +432,101 @@ def _generate_where_statement(e, binds, op=None):
 class DataSet:
 
     __row_class__ = Row
+    __result_cache__ = False
+    __hints__ = []
+    __columns__ = None
+    __arraysize__ = None
+    __prefetchrows__ = None
+    __call_timeout__ = None
     __cols = None
 
     @classmethod
     def set_row_class(cls, row_class):
         cls.__row_class__ = row_class
 
+    @classmethod
+    def set_result_cache(cls, enabled=True):
+        """Enable or disable the client-side result cache.
+
+        When enabled, the results of the queries made with the ``fetch_*``
+        methods are stored in the result cache of the database (see
+        :class:`sibilla.caching.ResultCache`), keyed by the statement and the
+        bind values, and reused by identical queries. Cached results are
+        discarded when the data set is modified through a
+        :class:`sibilla.table.Table` method and at the end of every
+        transaction.
+        """
+        cls.__result_cache__ = enabled
+
+    @classmethod
+    def set_hints(cls, *hints):
+        """Set the optimizer hints for the queries on the data set.
+
+        The given hints are added to every query generated by the
+        ``fetch_*`` methods, in addition to those passed with the ``hints``
+        argument of each call. See :class:`Hint` for some helpers.
+
+        Example:
+            >>> View.set_hints(Hint.RESULT_CACHE)
+            >>> db.sales_summary.fetch_all(hints=[Hint.first_rows(10)])
+        """
+        cls.__hints__ = list(hints)
+
+    @classmethod
+    def set_fetch_size(cls, arraysize=None, prefetchrows=None):
+        """Set the fetch size of the queries on the data set.
+
+        The given values are used by :func:`fetch_all`, unless others are
+        passed with the call. See :func:`sibilla.Database.plsql` and
+        :func:`sibilla.Database.fetch_all` for their meaning. Use
+        ``arraysize="auto"`` to let the array size adapt to the size of the
+        rows and to the fetch time.
+
+        Example:
+            >>> Table.set_fetch_size(arraysize="auto")
+            >>> db.narrow_lookup.fetch_all(prefetchrows=10, key=42)
+        """
+        cls.__arraysize__ = arraysize
+        cls.__prefetchrows__ = prefetchrows
+
+    @classmethod
+    def set_call_timeout(cls, seconds):
+        """Set the timeout of the queries on the data set.
+
+        The given timeout, in seconds, is used by the ``fetch_*`` methods,
+        unless another one is passed with the ``call_timeout`` argument of
+        each call. Queries that take longer raise a
+        :class:`sibilla.CallTimeoutError`. See
+        :func:`sibilla.Database.call_timeout` for more details.
+
+        Example:
+            >>> Table.set_call_timeout(30)
+            >>> db.customer.fetch_all(call_timeout=5)
+        """
+        cls.__call_timeout__ = seconds
+
+    @classmethod
+    def set_columns(cls, *columns):
+        """Set the default projection of the queries on the data set.
+
+        The ``fetch_*`` methods select the given columns only, rather than
+        all of them, unless a ``select`` argument is passed explicitly. Call
+        with no arguments to select all the columns again.
+
+        Example:
+            >>> class Customer(Table):
+            ...     __table__ = "customer"
+            >>> Customer.set_columns("id", "name")
+        """
+        cls.__columns__ = list(columns) or None
+
+    def _projection(self, select):
+        # The columns to select when all of them are requested
+        if select != "*":
+            return select
+
+        return self.__columns__ or "*"
+
     def __call__(self, **kwargs):
         """Make an Oracle Table a callable object whose return value is a Row
         object referencing a row in the table by the table's primary key.
@@ -274,47 +549,561 @@ class DataSet:
         return self.fetch_all(**kwargs)
 
     def _generate_select_statement(
-        self, select="*", where=None, order_by=None
+        self, select="*", where=None, order_by=None, hints=None, group_by=None
     ):
-        binds = {}
-        where_stmt = ("where " + _generate_where_statement(where, binds)) \
-            if where else ""
+        # Statements are cached by query shape, so that the SQL text is only
+        # generated once for queries that differ by their bind values only.
+        shape, values = _resolve_where(where) if where else (None, [])
+        hints = tuple(self.__hints__) + tuple(hints or [])
+        group_by = tuple(group_by or [])
+        source, source_binds = self._source()
+        key = (source, tuple(select), shape, order_by, hints, group_by)
+
+        with _statement_cache_lock:
+            cached = _statement_cache.get(key)
+
+        if cached is None:
+            names = []
+            cached = self._format_select(
+                select,
+                _compile_where(shape, names) if where else None,
+                order_by,
+                hints,
+                group_by,
+                source
+            ), names
+
+            with _statement_cache_lock:
+                _statement_cache[key] = cached
+
+        statement, names = cached
+        binds = dict(zip(names, values))
+        binds.update(source_binds)
 
+        return statement, binds
+
+    def _source(self, partition=None):
+        # The source of the generated queries, as of the SCN of the active
+        # snapshot, if any, together with its bind values.
+        source = self.name
+        if partition is not None:
+            source += ' partition ("{}")'.format(partition)
+
+        scn = self.db.__snapshot__
+        if scn is None:
+            return source, {}
+
+        return (
+            "{} as of scn :{}".format(source, _SNAPSHOT_BIND),
+            {_SNAPSHOT_BIND: scn}
+        )
+
+    def _format_select(
+        self, select, where, order_by, hints, group_by=None, source=None
+    ):
         return """
-            select {cols}
+            select {hints}{cols}
             from   {tab}
             {where}
+            {group_by}
             {order_by}""".format(
+                hints=_generate_hints(hints, self.name),
                 cols=', '.join(select),
-                tab=self.name,
-                where=where_stmt,
+                tab=source or self.name,
+                where=("where " + where) if where else "",
+                group_by=(
+                    "group by " + ", ".join(group_by) if group_by else ""
+                ),
                 order_by=(
                     " order by {}".format(order_by) if order_by is not None
                     else ""
                 )
-        ), binds
+        )
 
-    def _prepare_fetch(self, select, where, order_by, kwargs):
+    def prepare(self, select="*", where=None, order_by=None, hints=None):
+        """Prepare a query for repeated execution.
+
+        The returned query is compiled once and can be called with different
+        bind values. See :class:`PreparedQuery` for details.
+
+        Example:
+            >>> q = db.orders.prepare(where=("customer_id", "amount__gt"))
+            >>> q(customer_id=42, amount__gt=100)
+
+        Args:
+            select (list): The columns to select.
+            where: The where clause, with parameter names in place of the
+                conditions. See :class:`PreparedQuery`.
+            order_by (str): The order by clause.
+            hints (list): The optimizer hints.
+
+        Returns:
+            :class:`PreparedQuery`: the prepared query.
+        """
+        return PreparedQuery(self, select, where, order_by, hints)
+
+    def join(self, other, on=None, how="inner"):
+        """Join the data set with another one.
+
+        The join condition can be given as the name of a column that the two
+        data sets have in common, as a pair of column names, or as SQL text.
+        When it is omitted, it is determined from the foreign keys between the
+        two data sets, if they are tables.
+
+        Example:
+            >>> orders = db.orders.join(db.customer)
+            >>> orders = db.orders.join(db.customer, on="customer_id")
+            >>> orders = db.orders.join(db.customer, on=("customer_id", "id"))
+
+        Args:
+            other (:class:`DataSet`): The data set to join.
+            on: The join condition.
+            how (str): The join type, one of ``"inner"``, ``"left"``,
+                ``"right"`` and ``"full"``.
+
+        Returns:
+            :class:`sibilla.join.Join`: the join, which can be queried like
+            a data set.
+        """
+        from sibilla.join import Join
+
+        return Join(self, other, on, how)
+
+    def _prepare_fetch(
+        self, select, where, order_by, kwargs, hints=None, group_by=None
+    ):
         if not where and kwargs:
             where = (kwargs,)
             kwargs = {}
 
         statement, binds = self._generate_select_statement(
-            select, where, order_by
+            self._projection(select), where, order_by, hints, group_by
         )
         binds.update(kwargs)
 
         return statement, binds
 
-    def fetch_one(self, select="*", where=None, order_by=None, **kwargs):
+    def _fetch_cached(self, statement, binds, n=None, call_timeout=None,
+                      arraysize=None, prefetchrows=None):
+        # Get the result of a query from the result cache, if enabled,
+        # fetching it from the database on a miss.
+        if not self.__result_cache__:
+            return None
+
+        key = (statement, n, tuple(sorted(binds.items())))
+        try:
+            hash(key)
+        except TypeError:
+            # Unhashable bind values
+            return None
+
+        cache = self.db.result_cache
+        result = cache.get(key)
+        if result is None:
+            result = self._fetch_rows(
+                statement, binds, n, call_timeout, arraysize, prefetchrows
+            )
+            cache.put(self.name, key, *result)
+
+        return result
+
+    def _fetch_rows(self, statement, binds, n=None, call_timeout=None,
+                    arraysize=None, prefetchrows=None):
+        # Get the description and all, or the first n, rows of a query, with
+        # the same fetch settings, timeout and error handling of the fetch_*
+        # methods. The cursor is closed.
+        db = self.db
+        if call_timeout is None:
+            call_timeout = self.__call_timeout__
+        if n is not None:
+            arraysize = max(min(n, _MAX_ARRAYSIZE), 1)
+        else:
+            if arraysize is None:
+                arraysize = self.__arraysize__
+            if arraysize == "auto":
+                arraysize = db._describe_arraysize(statement)
+        if prefetchrows is None:
+            prefetchrows = self.__prefetchrows__
+
+        with db.call_timeout(call_timeout):
+            cursor = db.plsql(
+                statement, arraysize=arraysize, prefetchrows=prefetchrows,
+                **binds
+            )
+            try:
+                rows = (
+                    db._fetch(cursor, cursor.fetchall) if n is None
+                    else db._fetch(cursor, cursor.fetchmany, n)
+                )
+                return cursor.description, rows
+            finally:
+                db._close(cursor)
+
+    def _fetch_raw(self, statement, binds):
+        # Get the description and all the rows of a query, through the result
+        # cache when enabled.
+        cached = self._fetch_cached(statement, binds)
+        if cached is not None:
+            return cached
+
+        return self._fetch_rows(statement, binds)
+
+    def count(self, where=None, hints=None, **kwargs):
+        """Count the rows of the data set on the server side.
+
+        Example:
+            >>> db.employee.count(site_id__in=[1, 2])
+            42
+
+        Args:
+            where: The where clause, as for :func:`fetch_all`.
+            hints (list): The optimizer hints.
+            **kwargs: The conditions, as for :func:`fetch_all`.
+
+        Returns:
+            int: the number of rows that match the given conditions.
+        """
+        statement, binds = self._prepare_fetch(
+            ["count(*)"], where, None, kwargs, hints
+        )
+        _, rows = self._fetch_raw(statement, binds)
+
+        return rows[0][0]
+
+    def exists(self, where=None, hints=None, **kwargs):
+        """Check whether the data set has any row that matches the given
+        conditions.
+
+        The query stops at the first matching row.
+
+        Args:
+            where: The where clause, as for :func:`fetch_all`.
+            hints (list): The optimizer hints.
+            **kwargs: The conditions, as for :func:`fetch_all`.
+
+        Returns:
+            bool: ``True`` if at least one row matches the conditions.
+        """
+        statement, binds = self._prepare_fetch(
+            ["1"], where, None, kwargs, hints
+        )
+        _, rows = self._fetch_raw(
+            "select count(*) from dual where exists ({})".format(statement),
+            binds
+        )
+
+        return bool(rows[0][0])
+
+    def aggregate(
+        self, group_by=None, sum=None, avg=None, min=None, max=None,
+        count=None, where=None, order_by=None, hints=None, **kwargs
+    ):
+        """Aggregate the rows of the data set on the server side.
+
+        The aggregated columns are named after the aggregate function and the
+        column, e.g. ``sum_amount`` for ``sum=["amount"]``. The grouping
+        columns are also returned and, unless an ``order_by`` clause is given,
+        the rows are sorted by them.
+
+        Example:
+            >>> for row in db.orders.aggregate(
+            ...     group_by=["customer_id"], sum=["amount"], count=["id"],
+            ...     status="OPEN"
+            ... ):
+            ...     print(row.customer_id, row.sum_amount, row.count_id)
+
+        Args:
+            group_by (list): The columns to group by.
+            sum (list): The columns to sum.
+            avg (list): The columns to average.
+            min (list): The columns to take the minimum of.
+            max (list): The columns to take the maximum of.
+            count (list): The columns to count the non-null values of.
+            where: The where clause, as for :func:`fetch_all`.
+            order_by (str): The order by clause.
+            hints (list): The optimizer hints.
+            **kwargs: The conditions, as for :func:`fetch_all`.
+
+        Returns:
+            list: the aggregated rows, wrapped by the database row wrapper.
+        """
+        group_by = list(group_by or [])
+        select = group_by + [
+            "{0}({1}) as {0}_{1}".format(function, column)
+            for function, columns in (
+                ("sum", sum), ("avg", avg), ("min", min), ("max", max),
+                ("count", count)
+            )
+            for column in columns or []
+        ]
+        if not select:
+            raise QueryError("Nothing to aggregate")
+
+        if order_by is None and group_by:
+            order_by = ", ".join(group_by)
+
+        statement, binds = self._prepare_fetch(
+            select, where, order_by, kwargs, hints, group_by
+        )
+        description, rows = self._fetch_raw(statement, binds)
+
+        wrapper = self.db.__row_wrapper__
+        return wrapper.from_list(
+            SimpleNamespace(description=description), rows
+        ) if wrapper else rows
+
+    def changes_since(self, watermark=None, column=None, select="*"):
+        """Get the rows changed after the given watermark.
+
+        When a column is given, e.g. a last-modified timestamp or a version
+        number maintained by the application, the changed rows are those whose
+        value in the column is greater than the watermark, and the new
+        watermark is the current maximum value. Otherwise, the rows are
+        determined from their ``ORA_ROWSCN`` within a snapshot (see
+        :func:`sibilla.Database.snapshot`), and the new watermark is the SCN
+        of the snapshot. Unless the table was created with
+        ``ROWDEPENDENCIES``, the ``ORA_ROWSCN`` is tracked by block, hence
+        some unchanged rows might be returned too.
+
+        Passing the returned watermark to the next call gives the rows changed
+        in between. See :class:`sibilla.watermark.WatermarkStore` to persist
+        watermarks across runs.
+
+        Example:
+            >>> rows, watermark = db.orders.changes_since(
+            ...     last_watermark, column="updated_at"
+            ... )
+
+        Args:
+            watermark: The watermark of the last extraction. All the rows are
+                returned when ``None``.
+            column (str): The column to compare with the watermark.
+            select (list): The columns to select.
+
+        Returns:
+            tuple: the changed rows, as a generator, and the new watermark.
+        """
+        if column is None:
+            with self.db.snapshot() as scn:
+                return self.fetch_all(
+                    select,
+                    ({"ora_rowscn__gt": watermark},)
+                    if watermark is not None else None
+                ), scn
+
+        statement, binds = self._prepare_fetch(
+            ["max({})".format(column)], None, None, {}
+        )
+        high, = self.db.plsql(statement, **binds).fetchone()
+        if high is None or high == watermark:
+            return iter([]), watermark
+
+        conditions = {column + "__le": high}
+        if watermark is not None:
+            conditions[column + "__gt"] = watermark
+
+        return self.fetch_all(select, (conditions,)), high
+
+    def copy_to(
+        self, target, batch_size=1000, transform=None, workers=1,
+        select="*", where=None, columns=None, **kwargs
+    ):
+        """Copy the rows of the data set into a table.
+
+        Rows are streamed from the data set in batches, optionally mapped with
+        ``transform``, and inserted into the target table with
+        ``executemany``, while the next batches are being fetched. Batches are
+        passed through a bounded queue, so that memory usage does not depend
+        on the number of rows. The rows are fetched by the calling thread.
+
+        With a single worker, the rows are inserted on the database of the
+        target table, by a background thread if it is a different session
+        from the one of the data set, or by the calling thread, alternately
+        with the fetches, otherwise. The transaction is then left to the
+        caller. With more workers, batches are inserted concurrently on
+        sessions acquired from the pool of the target database (see
+        :class:`sibilla.pool.SessionPool`), and each batch is committed on
+        its own, as the sessions are released to the pool afterwards. A
+        failure can then leave part of the rows copied.
+
+        Example:
+            >>> db.orders.copy_to(
+            ...     archive_db.orders,
+            ...     transform=lambda row: row[:-1] + (row[-1].upper(),),
+            ...     status="CLOSED"
+            ... )
+
+        Args:
+            target (:class:`sibilla.table.Table`): The table to copy the rows
+                into.
+            batch_size (int): The number of rows fetched and inserted at once.
+            transform (callable): A function that maps each row, as a tuple,
+                into the tuple to insert, or ``None`` to skip it.
+            workers (int): The number of concurrent inserting sessions.
+            select (list): The columns to select.
+            where: The where clause, as for :func:`fetch_all`.
+            columns (list): The target columns. Defaults to the selected
+                columns.
+            **kwargs: The conditions, as for :func:`fetch_all`.
+
+        Returns:
+            int: the number of rows inserted.
+        """
+        pool = None
+        if workers > 1:
+            pool = target.db.__pool__
+            if pool is None:
+                raise QueryError(
+                    "Concurrent copies require a target database session "
+                    "from a pool"
+                )
+
+        statement, binds = self._prepare_fetch(select, where, None, kwargs)
+        # The fetch buffer is allocated on execution, so that each batch is
+        # fetched with a single round trip.
+        cursor = self.db.plsql(
+            statement, arraysize=batch_size, prefetchrows=batch_size, **binds
+        )
+
+        columns = columns or [c[0] for c in cursor.description]
+        insert = "insert into {} ({}) values ({})".format(
+            target.name,
+            ", ".join(columns),
+            ", ".join(":{}".format(i + 1) for i in range(len(columns)))
+        )
+
+        def insert_batch(insert_cursor, rows):
+            if transform is not None:
+                rows = [
+                    r for r in (transform(row) for row in rows)
+                    if r is not None
+                ]
+            if rows:
+                insert_cursor.executemany(insert, rows)
+            return len(rows)
+
+        if pool is None and target.db is self.db:
+            # The session cannot fetch and insert at the same time, so the
+            # batches are copied one after the other.
+            count = 0
+            try:
+                with self.db.cursor() as insert_cursor:
+                    while True:
+                        rows = cursor.fetchmany(batch_size)
+                        if not rows:
+                            return count
+                        count += insert_batch(insert_cursor, rows)
+            except cx_Oracle.DatabaseError as e:
+                raise DatabaseError(e) from e
+            finally:
+                cursor.close()
+                if hasattr(target, "invalidate"):
+                    target.invalidate()
+
+        batches = queue.Queue(maxsize=2 * workers)
+        stop = threading.Event()
+        errors = []
+        counts = []
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    pass
+
+        def get():
+            while not stop.is_set():
+                try:
+                    return batches.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+
+        def write(db, commit):
+            count = 0
+            try:
+                with db.cursor() as insert_cursor:
+                    while True:
+                        rows = get()
+                        if rows is None:
+                            return
+
+                        n = insert_batch(insert_cursor, rows)
+                        if n and commit:
+                            db.commit()
+                        count += n
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+            finally:
+                counts.append(count)
+
+        def pooled_write():
+            try:
+                with pool.session() as db:
+                    write(db, True)
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+
+        # The rows are fetched on the calling thread, which owns the source
+        # session, while the writers insert them on their own sessions.
+        writers = [
+            threading.Thread(target=write, args=(target.db, False))
+        ] if pool is None else [
+            threading.Thread(target=pooled_write) for _ in range(workers)
+        ]
+        for writer in writers:
+            writer.daemon = True
+            writer.start()
+
+        try:
+            while not stop.is_set():
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                put(rows)
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            for _ in writers:
+                put(None)
+            for writer in writers:
+                writer.join()
+            cursor.close()
+            if hasattr(target, "invalidate"):
+                target.invalidate()
+
+        if errors:
+            error = errors[0]
+            if isinstance(error, cx_Oracle.DatabaseError):
+                raise DatabaseError(error) from error
+            raise error
+
+        return sum(counts)
+
+    def fetch_one(
+        self, select="*", where=None, order_by=None, hints=None,
+        call_timeout=None, **kwargs
+    ):
         statement, binds = self._prepare_fetch(
-            select, where, order_by, kwargs
+            select, where, order_by, kwargs, hints
         )
-        result = self.db.fetch_one(
+        cached = self._fetch_cached(statement, binds, 1, call_timeout)
+        if cached is not None:
+            return self._wrap_raw(*cached, one=True)
+
+        return self._wrap_one(self.db.fetch_one(
             statement,
+            call_timeout=(
+                self.__call_timeout__ if call_timeout is None else call_timeout
+            ),
             **binds
-        )
+        ))
 
+    def _wrap_one(self, result):
         if not result:
             return None
 
@@ -329,16 +1118,38 @@ class DataSet:
                 f"row type {type(result)}"
             ) from ex
 
-    def fetch_all(self, select="*", where=None, order_by=None, **kwargs):
+    def fetch_all(
+        self, select="*", where=None, order_by=None, hints=None,
+        prefetch=None, arraysize=None, prefetchrows=None, call_timeout=None,
+        cancellable=False, **kwargs
+    ):
         statement, binds = self._prepare_fetch(
-            select, where, order_by, kwargs
+            select, where, order_by, kwargs, hints
+        )
+        cached = self._fetch_cached(
+            statement, binds, None, call_timeout, arraysize, prefetchrows
         )
+        if cached is not None:
+            rows = self._iter_raw(*cached)
+            return FetchHandle(self.db, None, rows) if cancellable else rows
+
         result = self.db.fetch_all(
             statement,
+            prefetch=prefetch,
+            arraysize=(
+                self.__arraysize__ if arraysize is None else arraysize
+            ),
+            prefetchrows=(
+                self.__prefetchrows__ if prefetchrows is None else prefetchrows
+            ),
+            call_timeout=(
+                self.__call_timeout__ if call_timeout is None else call_timeout
+            ),
+            cancellable=cancellable,
             **binds
         )
         if self.__row_class__:
-            def row_generator():
+            def row_generator(result):
                 for e in result:
                     try:
                         yield self.__row_class__(self, e)
@@ -347,18 +1158,34 @@ class DataSet:
                             f"Row class {self.__row_class__} is incompatible "
                             f"with wrapped row type {type(e)}"
                         ) from ex
-            return row_generator()
+
+            if cancellable:
+                return result.derive(row_generator)
+            return row_generator(result)
         else:
             return result
 
-    def fetch_many(self, n, select="*", where=None, order_by=None, **kwargs):
+    def fetch_many(
+        self, n, select="*", where=None, order_by=None, hints=None,
+        call_timeout=None, **kwargs
+    ):
         statement, binds = self._prepare_fetch(
-            select, where, order_by, kwargs
+            select, where, order_by, kwargs, hints
         )
-        result = self.db.fetch_many(
+        cached = self._fetch_cached(statement, binds, n, call_timeout)
+        if cached is not None:
+            return self._wrap_raw(*cached)
+
+        return self._wrap_list(self.db.fetch_many(
             statement,
-            n, **binds
-        )
+            n,
+            call_timeout=(
+                self.__call_timeout__ if call_timeout is None else call_timeout
+            ),
+            **binds
+        ))
+
+    def _wrap_list(self, result):
         try:
             return (
                 [self.__row_class__(self, row) for row in result]
@@ -371,6 +1198,26 @@ class DataSet:
                 f"row type in collection {type(result)}"
             ) from ex
 
+    def _wrap_raw(self, description, rows, one=False):
+        # Wrap raw rows as if they had just been fetched from a cursor with the
+        # given description.
+        wrapper = self.db.__row_wrapper__
+        cursor = SimpleNamespace(description=description)
+
+        if one:
+            return self._wrap_one(
+                (wrapper(cursor, rows[0]) if wrapper else rows[0])
+                if rows else None
+            )
+
+        return self._wrap_list(
+            wrapper.from_list(cursor, rows) if wrapper else rows
+        )
+
+    def _iter_raw(self, description, rows):
+        result = self._wrap_raw(description, rows)
+        return iter(result) if isinstance(result, list) else result
+
     def __iter__(self):
         """Make a table iterable on its rows.
 
@@ -395,3 +1242,230 @@ class DataSet:
             self.__cols = [c[0] for c in self.describe()]
 
         return self.__cols
+
+
+# ---- Prepared queries -------------------------------------------------------
+
+
+def _resolve_parameters(e, params):
+    """Resolve the where clause of a prepared query into its shape.
+
+    The parameters required by the query are appended to ``params`` in the
+    same order as the bind variables in the compiled text, together with
+    their kind.
+    """
+    if isinstance(e, (list, tuple)) and e and all(
+        isinstance(i, str) for i in e
+    ):
+        conditions = []
+        for k in e:
+            column, op = _split_operator(k)
+            op = op or "eq"
+            if op == "isnull":
+                raise QueryError(
+                    "Parameter {} cannot be used in a prepared query".format(k)
+                )
+            conditions.append(
+                ("dict", ((column, op, 1) if op in ("in", "notin")
+                          else (column, op),))
+            )
+            params.append((k, op))
+
+        return ("or" if isinstance(e, list) else "and", tuple(conditions))
+
+    if isinstance(e, (list, tuple)):
+        return (
+            "or" if isinstance(e, list) else "and",
+            tuple(_resolve_parameters(i, params) for i in e)
+        )
+
+    raise QueryError("Invalid prepared where clause: {}".format(repr(e)))
+
+
+_STRING_TYPES = (
+    None,
+    cx_Oracle.DB_TYPE_CHAR,
+    cx_Oracle.DB_TYPE_NCHAR,
+    cx_Oracle.DB_TYPE_VARCHAR,
+    cx_Oracle.DB_TYPE_NVARCHAR,
+)
+
+
+class PreparedQuery:
+    """Prepared data set query.
+
+    A prepared query is compiled once, when it is created with
+    :func:`DataSet.prepare`, and can then be executed many times with
+    different bind values only. As its statement is fixed, a prepared query
+    is not affected by snapshots (see :func:`sibilla.Database.snapshot`).
+    Every execution on a session reuses the same dedicated cursor, with the
+    statement already parsed and the input sizes already determined from the
+    data set columns, thus avoiding any SQL generation and parsing. Through
+    a :class:`sibilla.pool.LocalDatabase`, each thread executes the query on
+    its own session, with a cursor of its own. The cursors are closed with
+    :func:`close`, or on exit when the query is used as a context manager.
+
+    The where clause of a prepared query has the same structure of the where
+    clauses accepted by the ``fetch_*`` methods of :class:`DataSet`, with
+    tuples and lists of parameter names in place of dictionaries of
+    conditions. Parameter names are column names, optionally followed by an
+    operator (see :func:`DataSet.fetch_all`), and are used as keyword
+    arguments when calling the query.
+
+    Example:
+        The query
+
+            >>> q = db.orders.prepare(
+            ...     select=["id", "amount"],
+            ...     where=(("customer_id",), ["status", "amount__gt"]),
+            ...     order_by="id"
+            ... )
+
+        is equivalent to ``customer_id = :1 and (status = :2 or amount > :3)``
+        and can be executed with
+
+            >>> q(customer_id=42, status="OPEN", amount__gt=100)
+
+        or, for many sets of bind values, with
+
+            >>> for rows in q.many(binds):
+            ...     process(rows)
+
+        or, closing the cursors on exit, with
+
+            >>> with db.orders.prepare(where=("id",)) as q:
+            ...     orders = [q.one(id=i) for i in ids]
+    """
+
+    def __init__(self, dataset, select="*", where=None, order_by=None,
+                 hints=None):
+        self.dataset = dataset
+
+        self._params = []
+        names = []
+        self.statement = dataset._format_select(
+            dataset._projection(select),
+            _compile_where(_resolve_parameters(where, self._params), names)
+            if where else None,
+            order_by,
+            tuple(dataset.__hints__) + tuple(hints or [])
+        )
+        self._names = names
+
+        # Strings are left to the driver as their size depends on the value.
+        types = {c[0]: c[1] for c in dataset.describe()}
+        binds = []
+        for param, op in self._params:
+            binds += [(param, op)] * (2 if op == "between" else 1)
+
+        self._input_sizes = {}
+        for name, (param, op) in zip(names, binds):
+            column_type = types.get(sql_identifier(_split_operator(param)[0]))
+            if op not in ("in", "notin", "like", "notlike") \
+                    and column_type not in _STRING_TYPES:
+                self._input_sizes[name] = column_type
+
+        self._sessions = weakref.WeakSet()
+        self._description = None
+        self._lock = threading.Lock()
+
+    def _bind(self, kwargs):
+        values = []
+        try:
+            for param, op in self._params:
+                value = kwargs[param]
+                if op == "between":
+                    values += list(value)
+                elif op in ("in", "notin"):
+                    if len(value) > _COLLECTION_CHUNK_SIZE:
+                        raise QueryError(
+                            "Too many values for {}".format(param)
+                        )
+                    values.append(self.dataset.db._bind(Collection(value)))
+                else:
+                    values.append(value)
+        except KeyError as e:
+            raise QueryError("Missing parameter: {}".format(e)) from e
+
+        return dict(zip(self._names, values))
+
+    def _session_cursor(self):
+        # The dedicated cursor of the query on the session of the calling
+        # thread, and its lock. The cursors are kept by the sessions, so that
+        # they are discarded together.
+        db = self.dataset.db
+        if db.__shared__:
+            db = db.__db__
+
+        with self._lock:
+            entry = db._prepared.get(self)
+            if entry is None:
+                cursor = db.cursor()
+                cursor.prepare(self.statement)
+                entry = db._prepared[self] = (cursor, threading.Lock())
+                self._sessions.add(db)
+
+        return entry
+
+    def _execute(self, kwargs, n=None):
+        binds = self._bind(kwargs)
+
+        try:
+            cursor, lock = self._session_cursor()
+            with lock:
+                cursor.setinputsizes(**self._input_sizes)
+                cursor.execute(None, binds)
+                if self._description is None:
+                    self._description = cursor.description
+
+                rows = (
+                    cursor.fetchall() if n is None else cursor.fetchmany(n)
+                )
+        except cx_Oracle.DatabaseError as e:
+            raise DatabaseError(e) from e
+
+        return self._description, rows
+
+    def __call__(self, **kwargs):
+        """Execute the query with the given bind values.
+
+        Returns:
+            list: the rows returned by the query.
+        """
+        return self.dataset._wrap_raw(*self._execute(kwargs))
+
+    def one(self, **kwargs):
+        """Execute the query and return the first row only, if any."""
+        return self.dataset._wrap_raw(*self._execute(kwargs, 1), one=True)
+
+    def many(self, binds):
+        """Execute the query for every set of bind values.
+
+        Args:
+            binds: An iterable of dictionaries of bind values.
+
+        Returns:
+            generator: the list of the rows returned by every execution.
+        """
+        for kwargs in binds:
+            yield self(**kwargs)
+
+    def close(self):
+        """Close the dedicated cursors of the query."""
+        with self._lock:
+            sessions = list(self._sessions)
+            self._sessions.clear()
+
+            for db in sessions:
+                entry = db._prepared.pop(self, None)
+                if entry is not None:
+                    db._close(entry[0])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __repr__(self):
+        return "<prepared query on {}>".format(self.dataset)
@@ -22,7 +22,7 @@
 
 import cx_Oracle
 
-from sibilla import datatypes
+from sibilla import _database_error, datatypes
 from sibilla.callable import Callable, CallableError
 from sibilla.object import ObjectType
 
@@ -234,7 +234,9 @@ class Function(Callable):
         try:
             return cur.callfunc(self.callable_name, ora_ret_type, args, kwargs)
         except cx_Oracle.DatabaseError as e:
-            raise CallableError(e) from e
+            db = cur.connection
+            cur.close()
+            raise _database_error(e, CallableError, db) from e
 
         # self.__ret_type = ret_type
         # self.__ora_ret_type = ora_ret_type
@@ -0,0 +1,378 @@
+# This file is part of "sibilla" which is released under GPL.
+#
+# See file LICENCE or go to http://www.gnu.org/licenses/ for full license
+# details.
+#
+# Sibilla is a Python ORM for the Oracle Database.
+#
+# Copyright (c) 2019 Gabriele N. Tornetta <phoenix1987@gmail.com>.
+# All rights reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import re
+
+from sibilla import CursorRow, sql_identifier
+from sibilla.dataset import (
+    QueryError, _compile_where, _generate_hints, _resolve_where,
+    _statement_cache, _statement_cache_lock
+)
+
+
+# ---- Exceptions -------------------------------------------------------------
+
+
+class JoinError(QueryError):
+    """Join error."""
+    pass
+
+
+# ---- Local helpers ----------------------------------------------------------
+
+
+_JOIN_TYPES = {
+    "inner": "join",
+    "left": "left outer join",
+    "right": "right outer join",
+    "full": "full outer join",
+}
+
+# Plain or qualified column names, which are given their qualified name in
+# the joined rows. They are aliased positionally in the select list, as the
+# qualified names can exceed the 30 bytes allowed by Oracle before 12.2.
+_COLUMN_RE = re.compile(r"^\w+(\.\w+)?$")
+
+
+def _foreign_key(dataset, other):
+    """Find a foreign key from ``dataset`` to ``other``.
+
+    Returns the referencing and the referenced column, or ``None``.
+    """
+    name = other.name.lower()
+    for column, table in getattr(dataset, "__fk__", {}).items():
+        if table == name:
+            pk = getattr(other, "__pk__", None)
+            if not pk or len(pk) != 1:
+                raise JoinError(
+                    "Cannot join on {} without a single column primary key"
+                    .format(other.name)
+                )
+            return column, pk[0]
+
+    return None
+
+
+# ---- Classes ----------------------------------------------------------------
+
+
+class JoinRow(CursorRow):
+    """Joined row.
+
+    The columns of a joined row are qualified by the name of the data set
+    they come from, e.g. ``ORDERS.ID``. Each value can be accessed by its
+    qualified name, like ``row["orders.id"]``, or by its column name only,
+    like ``row.amount``, provided it is not ambiguous. The values from a
+    single data set can be accessed as a whole with, e.g., ``row.orders``,
+    which is a :class:`sibilla.CursorRow`.
+    """
+
+    @staticmethod
+    def from_cursor(cursor, columns=None):
+        columns = columns or [c[0] for c in cursor.description]
+        for row in cursor:
+            yield JoinRow(cursor, row, columns)
+
+    @staticmethod
+    def from_list(cursor, data, columns=None):
+        columns = columns or [c[0] for c in cursor.description]
+        return [JoinRow(cursor, row, columns) for row in data]
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        name = sql_identifier(name)
+        state = self.__dict__["_state"]
+        if name in state:
+            return state[name]
+
+        prefix = name + "."
+        columns = [c for c in self._cols if c.startswith(prefix)]
+        if columns:
+            return CursorRow(
+                None,
+                [state[c] for c in columns],
+                [c[len(prefix):] for c in columns]
+            )
+
+        columns = [c for c in self._cols if c.endswith("." + name)]
+        if len(columns) == 1:
+            return state[columns[0]]
+
+        raise AttributeError(
+            ("Ambiguous column " if columns else "No such column ") + name
+        )
+
+    def __getitem__(self, i):
+        if isinstance(i, str):
+            return self._state[
+                ".".join(sql_identifier(p) for p in i.split("."))
+            ]
+
+        return super().__getitem__(i)
+
+
+class Join:
+    """Join between data sets.
+
+    Joins are created with :func:`sibilla.dataset.DataSet.join` and can be
+    extended with further data sets with :func:`join`. The whole join is
+    executed as a single SQL statement, with the projection, the where clause
+    and the ordering pushed down to the database. The resulting rows are
+    wrapped by :class:`JoinRow`. Within a snapshot (see
+    :func:`sibilla.Database.snapshot`), all the data sets are read as of the
+    same SCN.
+
+    Columns in the ``select``, ``where`` and ``order_by`` arguments can be
+    qualified with the name of their data set, e.g. ``"orders.id"``. By
+    default, all the columns of all the data sets are selected.
+
+    Example:
+        >>> for row in db.orders.join(db.customer).fetch_all(
+        ...     select=["orders.id", "customer.name"],
+        ...     where=({"orders.status": "OPEN"},),
+        ...     order_by="orders.id"
+        ... ):
+        ...     print(row.id, row.name)
+    """
+
+    def __init__(self, left, right, on=None, how="inner"):
+        self.db = left.db
+        self._datasets = [left]
+        self._joins = []
+        self._add(right, on, how)
+
+    def _add(self, other, on, how):
+        try:
+            join_type = _JOIN_TYPES[how]
+        except KeyError:
+            raise JoinError("Invalid join type: {}".format(how))
+
+        if any(d.name == other.name for d in self._datasets):
+            raise JoinError("{} is already in the join".format(other.name))
+
+        self._joins.append(
+            (join_type, other, self._resolve_on(other, on))
+        )
+        self._datasets.append(other)
+
+    def _resolve_on(self, other, on):
+        if isinstance(on, str) and not _COLUMN_RE.match(on):
+            # Explicit join condition
+            return on
+
+        if on is None:
+            for dataset in reversed(self._datasets):
+                key = _foreign_key(dataset, other)
+                if key is not None:
+                    return "{}.{} = {}.{}".format(
+                        dataset.name, key[0], other.name, key[1]
+                    )
+
+                key = _foreign_key(other, dataset)
+                if key is not None:
+                    return "{}.{} = {}.{}".format(
+                        dataset.name, key[1], other.name, key[0]
+                    )
+
+            raise JoinError(
+                "No foreign key to join {} on".format(other.name)
+            )
+
+        left, right = (on, on) if isinstance(on, str) else on
+        if "." not in left:
+            column = sql_identifier(left)
+            for dataset in reversed(self._datasets):
+                if column in dataset.__cols__:
+                    left = dataset.name + "." + left
+                    break
+            else:
+                raise JoinError("No data set with column {}".format(left))
+
+        if "." not in right:
+            right = other.name + "." + right
+
+        return "{} = {}".format(left, right)
+
+    def join(self, other, on=None, how="inner"):
+        """Join the data set with a further one.
+
+        Args:
+            other (:class:`sibilla.dataset.DataSet`): The data set to join.
+            on: The join condition. See :func:`sibilla.dataset.DataSet.join`.
+            how (str): The join type, one of ``"inner"``, ``"left"``,
+                ``"right"`` and ``"full"``.
+
+        Returns:
+            :class:`Join`: the extended join.
+        """
+        join = Join.__new__(Join)
+        join.db = self.db
+        join._datasets = list(self._datasets)
+        join._joins = list(self._joins)
+        join._add(other, on, how)
+
+        return join
+
+    def _select_list(self, select):
+        # The select list, with the names of the columns in the joined rows,
+        # or None for the expressions, which keep the name given by the
+        # database.
+        if select is None:
+            columns = [
+                "{}.{}".format(d.name, c)
+                for d in self._datasets for c in d.__cols__
+            ]
+            return [
+                "{} c{}".format(c, i) for i, c in enumerate(columns)
+            ], columns
+
+        items, columns = [], []
+        for i, c in enumerate(select):
+            if _COLUMN_RE.match(c):
+                items.append("{} c{}".format(c, i))
+                columns.append(
+                    ".".join(sql_identifier(p) for p in c.split("."))
+                )
+            else:
+                items.append(c)
+                columns.append(None)
+
+        return items, columns
+
+    def _generate_select_statement(
+        self, select=None, where=None, order_by=None, hints=None
+    ):
+        shape, values = _resolve_where(where) if where else (None, [])
+        hints = tuple(hints or [])
+        source, source_binds = self._datasets[0]._source()
+        joins = tuple(
+            "{} {} on {}".format(join_type, other._source()[0], condition)
+            for join_type, other, condition in self._joins
+        )
+        key = (
+            "join", source, joins, tuple(select or []), shape, order_by, hints
+        )
+
+        with _statement_cache_lock:
+            cached = _statement_cache.get(key)
+
+        if cached is None:
+            names = []
+            items, columns = self._select_list(select)
+            cached = """
+            select {hints}{cols}
+            from   {tab}
+            {joins}
+            {where}
+            {order_by}""".format(
+                hints=_generate_hints(hints, self._datasets[0].name),
+                cols=", ".join(items),
+                tab=source,
+                joins="\n            ".join(joins),
+                where=(
+                    "where " + _compile_where(shape, names) if where else ""
+                ),
+                order_by=(
+                    "order by " + order_by if order_by is not None else ""
+                )
+            ), names, columns
+
+            with _statement_cache_lock:
+                _statement_cache[key] = cached
+
+        statement, names, columns = cached
+        binds = dict(zip(names, values))
+        binds.update(source_binds)
+
+        return statement, binds, columns
+
+    def _execute(self, select, where, order_by, hints, kwargs):
+        if not where and kwargs:
+            where = (kwargs,)
+            kwargs = {}
+
+        statement, binds, columns = self._generate_select_statement(
+            select, where, order_by, hints
+        )
+        binds.update(kwargs)
+
+        cursor = self.db.plsql(statement, **binds)
+        return cursor, [
+            column or c[0] for column, c in zip(columns, cursor.description)
+        ]
+
+    def fetch_one(
+        self, select=None, where=None, order_by=None, hints=None, **kwargs
+    ):
+        """Fetch the first row of the join, if any.
+
+        The arguments are the same as for :func:`fetch_all`.
+        """
+        cursor, columns = self._execute(
+            select, where, order_by, hints, kwargs
+        )
+        row = cursor.fetchone()
+
+        return JoinRow(cursor, row, columns) if row else None
+
+    def fetch_all(
+        self, select=None, where=None, order_by=None, hints=None, **kwargs
+    ):
+        """Fetch all the rows of the join.
+
+        Args:
+            select (list): The columns to select, optionally qualified by
+                the name of their data set. Defaults to all the columns.
+            where: The where clause, as for
+                :func:`sibilla.dataset.DataSet.fetch_all`.
+            order_by (str): The order by clause.
+            hints (list): The optimizer hints.
+            **kwargs: The conditions, as for
+                :func:`sibilla.dataset.DataSet.fetch_all`.
+
+        Returns:
+            generator: the joined rows.
+        """
+        return JoinRow.from_cursor(
+            *self._execute(select, where, order_by, hints, kwargs)
+        )
+
+    def fetch_many(
+        self, n, select=None, where=None, order_by=None, hints=None, **kwargs
+    ):
+        """Fetch the first ``n`` rows of the join.
+
+        The other arguments are the same as for :func:`fetch_all`.
+        """
+        cursor, columns = self._execute(
+            select, where, order_by, hints, kwargs
+        )
+
+        return JoinRow.from_list(cursor, cursor.fetchmany(n), columns)
+
+    def __iter__(self):
+        return self.fetch_all()
+
+    def __repr__(self):
+        return "<join {}>".format(", ".join(d.name for d in self._datasets))
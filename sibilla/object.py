@@ -39,6 +39,7 @@ class ObjectType(type):
     PACKAGE = "PACKAGE"
     PROCEDURE = "PROCEDURE"
     FUNCTION = "FUNCTION"
+    SEQUENCE = "SEQUENCE"
     RECORD = "RECORD"
 
 
@@ -112,6 +113,7 @@ from sibilla.function import Function
 from sibilla.package import Package
 from sibilla.procedure import Procedure
 from sibilla.schema import Schema, SchemaError
+from sibilla.sequence import Sequence
 from sibilla.table import Table
 from sibilla.view import View
 
@@ -122,6 +124,7 @@ _type_mapping = {
     ObjectType.PROCEDURE: Procedure,
     ObjectType.FUNCTION: Function,
     ObjectType.PACKAGE: Package,
+    ObjectType.SEQUENCE: Sequence,
 }
 
 # -----------------------------------------------------------------------------
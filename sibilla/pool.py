@@ -0,0 +1,276 @@
+# This file is part of "sibilla" which is released under GPL.
+#
+# See file LICENCE or go to http://www.gnu.org/licenses/ for full license
+# details.
+#
+# Sibilla is a Python ORM for the Oracle Database.
+#
+# Copyright (c) 2019 Gabriele N. Tornetta <phoenix1987@gmail.com>.
+# All rights reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import threading
+import weakref
+
+import cx_Oracle
+
+from sibilla import Database, DatabaseError, LoginError
+from sibilla.object import ObjectLookup
+
+
+# ---- Exceptions -------------------------------------------------------------
+
+
+class PoolError(DatabaseError):
+    """Session pool error."""
+    pass
+
+
+# ---- Classes ----------------------------------------------------------------
+
+
+class SessionPool(cx_Oracle.SessionPool):
+    """Pool of database sessions.
+
+    A subclass of :class:`cx_Oracle.SessionPool` whose sessions are
+    :class:`sibilla.Database` objects. Sessions acquired from a pool know the
+    pool they come from, so that operations that can be split across many
+    sessions, like :func:`sibilla.table.Table.parallel_scan`, can acquire
+    further ones as needed. ``SYS.DBMS_OUTPUT`` is enabled once for every new
+    session of the pool, rather than on each acquisition.
+
+    Example:
+        >>> from sibilla.pool import SessionPool
+        >>> pool = SessionPool(username, password, dsn=TNS, max=8)
+        >>> with pool.session() as db:
+        ...     rows = list(db.orders.parallel_scan(workers=4))
+    """
+
+    def __init__(self, user, password, dsn, min=1, max=4, increment=1,
+                 **kwargs):
+        kwargs.setdefault("threaded", True)
+        kwargs.setdefault("getmode", cx_Oracle.SPOOL_ATTRVAL_WAIT)
+        kwargs.setdefault("connectiontype", Database)
+        kwargs["sessionCallback"] = self._session_callback(
+            kwargs.get("sessionCallback")
+        )
+
+        try:
+            super().__init__(
+                user, password, dsn, min, max, increment, **kwargs
+            )
+        except cx_Oracle.DatabaseError as e:
+            error, = e.args
+            if error.code == 1017:
+                raise LoginError(error.message) from e
+
+            raise PoolError(error.message) from e
+
+    @staticmethod
+    def _session_callback(callback):
+        # Enable the standard streams of the new sessions, before handing
+        # them to any user callback.
+        def enable(connection, tag):
+            with connection.cursor() as cursor:
+                cursor.callproc("sys.dbms_output.enable")
+
+            if callback is not None:
+                callback(connection, tag)
+
+        return enable
+
+    def release(self, connection, tag=None):
+        """Release a session back to the pool.
+
+        Sessions left unusable by a call timeout are dropped from the pool
+        instead, so that they are not handed out again.
+
+        Args:
+            connection (sibilla.Database): the session to release.
+            tag (str): the optional tag to associate with the session.
+        """
+        if getattr(connection, "_unusable", False):
+            try:
+                self.drop(connection)
+            except cx_Oracle.Error:
+                pass
+            return
+
+        if tag is None:
+            super().release(connection)
+        else:
+            super().release(connection, tag)
+
+    def session(self):
+        """Acquire a session from the pool.
+
+        The returned object is a context manager that releases the session
+        back to the pool on exit.
+
+        Returns:
+            :class:`PooledSession`: the pooled session.
+        """
+        return PooledSession(self)
+
+    def local_database(self):
+        """Create a thread-local database proxy on the pool.
+
+        Returns:
+            :class:`LocalDatabase`: the database proxy.
+        """
+        return LocalDatabase(self)
+
+
+class PooledSession:
+    """Session acquired from a :class:`SessionPool`.
+
+    Use as a context manager to get the :class:`sibilla.Database` object and
+    release it automatically.
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.db = None
+
+    def __enter__(self):
+        try:
+            self.db = self.pool.acquire()
+        except cx_Oracle.DatabaseError as e:
+            raise PoolError(e) from e
+
+        return self.db
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        db, self.db = self.db, None
+        if exc_type is not None and not db._unusable:
+            db.rollback()
+        self.pool.release(db)
+
+
+class LocalDatabase:
+    """Thread-local database proxy.
+
+    A :class:`sibilla.Database` look-alike that can be shared by many
+    threads. Each thread that uses it is given its own session from the
+    pool, acquired on first use, to which every database operation made from
+    that thread is dispatched, including the calls to ``plsql`` and to stored
+    callables. The stored objects, on the other hand, are looked up once and
+    shared by all the threads, together with the look-up cache. The session
+    of a thread is released back to the pool with :func:`release`, or when
+    the thread is garbage collected.
+
+    As the sessions have transactions of their own, the rows of the shared
+    tables are not cached: the identity map is bypassed, and in-memory copies
+    of tables (see :func:`sibilla.table.Table.cache_all`) are not supported.
+
+    Example:
+        >>> pool = SessionPool(username, password, dsn=TNS, max=8)
+        >>> db = pool.local_database()
+        >>> def work(n):
+        ...     try:
+        ...         return db.pkg.func(n), db.customer.fetch_one(id=n)
+        ...     finally:
+        ...         db.release()
+        >>> with ThreadPoolExecutor(8) as executor:
+        ...     results = list(executor.map(work, range(100)))
+    """
+
+    def __init__(self, pool):
+        self._pool = pool
+        self._sessions = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._lookup = ObjectLookup(self)
+        self.cache = self._lookup.cache
+
+    def __getattr__(self, name):
+        db = self.__db__
+        if name in db.__dict__ or hasattr(type(db), name):
+            return getattr(db, name)
+
+        return getattr(self._lookup, name, None)
+
+    def __repr__(self):
+        return "<local database on {!r}>".format(self._pool)
+
+    def commit(self, flush_cache=True):
+        self.__db__.commit(flush_cache)
+
+        if flush_cache:
+            self.cache.flush()
+
+    def release(self):
+        """Release the session of the current thread, if any.
+
+        Uncommitted changes are rolled back.
+        """
+        with self._lock:
+            db = self._sessions.pop(threading.current_thread(), None)
+
+        if db is not None:
+            self._release(db)
+
+    def close(self):
+        """Release the sessions of all the threads.
+
+        No thread must be using the proxy when this method is called.
+        """
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+
+        for db in sessions:
+            self._release(db)
+
+    def _release(self, db):
+        try:
+            if not db._unusable:
+                db.rollback()
+            self._pool.release(db)
+        except cx_Oracle.DatabaseError as e:
+            raise PoolError(e) from e
+
+    # ---- Properties ---------------------------------------------------------
+
+    @property
+    def __db__(self):
+        """The session of the current thread."""
+        thread = threading.current_thread()
+        with self._lock:
+            db = self._sessions.get(thread)
+        if db is None:
+            try:
+                db = self._pool.acquire()
+            except cx_Oracle.DatabaseError as e:
+                raise PoolError(e) from e
+
+            with self._lock:
+                self._sessions[thread] = db
+
+        return db
+
+    @property
+    def __shared__(self):
+        """Whether the object is shared by sessions with different
+        transactions."""
+        return True
+
+    @property
+    def __lookup__(self):
+        """The shared ``ObjectLookup`` for object discovery."""
+        return self._lookup
+
+    @property
+    def __pool__(self):
+        """The session pool of the proxy."""
+        return self._pool
@@ -20,6 +20,9 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import cx_Oracle
+
+from sibilla import _call_error
 from sibilla.object import OracleObject, ObjectType
 from sibilla.callable import Callable
 
@@ -38,4 +41,12 @@ class Procedure(Callable):
 
     def __call__(self, *args, **kwargs):
         cur = self.db.cursor()
-        cur.callproc(self.callable_name, args, kwargs)
+        try:
+            cur.callproc(self.callable_name, args, kwargs)
+        except cx_Oracle.DatabaseError as e:
+            db = cur.connection
+            cur.close()
+            error = _call_error(e, db)
+            if error is None:
+                raise
+            raise error from e
@@ -0,0 +1,138 @@
+# This file is part of "sibilla" which is released under GPL.
+#
+# See file LICENCE or go to http://www.gnu.org/licenses/ for full license
+# details.
+#
+# Sibilla is a Python ORM for the Oracle Database.
+#
+# Copyright (c) 2019 Gabriele N. Tornetta <phoenix1987@gmail.com>.
+# All rights reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import threading
+from collections import deque
+
+from sibilla import DatabaseError
+from sibilla.object import ObjectType, OracleObject
+
+
+# ---- Exceptions -------------------------------------------------------------
+
+
+class SequenceError(DatabaseError):
+    """Sequence-related database error."""
+    pass
+
+
+# -----------------------------------------------------------------------------
+
+
+class Sequence(OracleObject):
+    """Oracle sequence class.
+
+    A sequence is an iterator over the values generated by the database.
+    Rather than requiring a round trip for every new value, values are fetched
+    in blocks of ``__block_size__`` with a single query and handed out from a
+    local, thread-safe buffer.
+
+    Example:
+        Assuming the database has a sequence called ``CUSTOMER_SEQ``, new
+        values can be obtained with
+
+            >>> next(db.customer_seq)
+            42
+            >>> db.customer_seq.take(3)
+            [43, 44, 45]
+
+    Like the sequence cache on the database side, the local buffer can cause
+    gaps in the generated values, e.g. when buffered values are discarded.
+    """
+
+    __sequence__ = None
+    __block_size__ = 20
+
+    def __init__(self, db, name=None, schema=None):
+        name = name or self.__sequence__
+
+        if name is None:
+            raise SequenceError("No sequence name given")
+
+        super().__init__(db, name, ObjectType.SEQUENCE, schema)
+
+        self._buffer = deque()
+        self._lock = threading.Lock()
+
+    def fetch(self, n):
+        """Fetch a block of new values from the database.
+
+        The values are generated with a single query, bypassing the local
+        buffer.
+
+        Args:
+            n (int): The number of values to fetch.
+
+        Returns:
+            list: the requested values, in ascending order.
+        """
+        if n < 1:
+            return []
+
+        return sorted(v for v, in self.db.plsql("""
+            select {}.nextval
+            from   dual
+            connect by level <= :n
+            """.format(
+                (self.__schema__ + "." if self.__schema__ else "") + self.name
+            ), n=n
+        ).fetchall())
+
+    def take(self, n):
+        """Take the given number of values.
+
+        Values are taken from the local buffer first. Any missing values are
+        then fetched from the database with a single query.
+
+        Args:
+            n (int): The number of values to take.
+
+        Returns:
+            list: the requested values.
+        """
+        with self._lock:
+            values = [
+                self._buffer.popleft()
+                for _ in range(min(n, len(self._buffer)))
+            ]
+
+        return values + self.fetch(n - len(values))
+
+    def flush(self):
+        """Discard the values in the local buffer."""
+        with self._lock:
+            self._buffer.clear()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        with self._lock:
+            if not self._buffer:
+                self._buffer.extend(self.fetch(self.__block_size__))
+
+            return self._buffer.popleft()
+
+    @property
+    def nextval(self):
+        """The next value of the sequence."""
+        return next(self)
@@ -0,0 +1,256 @@
+# This file is part of "sibilla" which is released under GPL.
+#
+# See file LICENCE or go to http://www.gnu.org/licenses/ for full license
+# details.
+#
+# Sibilla is a Python ORM for the Oracle Database.
+#
+# Copyright (c) 2019 Gabriele N. Tornetta <phoenix1987@gmail.com>.
+# All rights reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import threading
+
+from sibilla import DatabaseError
+
+
+# ---- Exceptions -------------------------------------------------------------
+
+
+class SessionError(DatabaseError):
+    """Unit of work error."""
+    pass
+
+
+# ---- Local helpers ----------------------------------------------------------
+
+
+def _dependency_order(tables):
+    """Sort tables so that referenced tables precede referencing ones.
+
+    The dependencies are determined from the foreign key constraints of each
+    table. Tables involved in cyclic dependencies are kept in their original
+    order.
+    """
+    names = {t.name.lower(): t for t in tables}
+    parents = {
+        name: set(t.__fk__.values()) & set(names) - {name}
+        for name, t in names.items()
+    }
+
+    ordered = []
+    while parents:
+        ready = [n for n, p in parents.items() if not p] or list(parents)[:1]
+        for name in ready:
+            ordered.append(names[name])
+            del parents[name]
+        for p in parents.values():
+            p.difference_update(ready)
+
+    return ordered
+
+
+# -----------------------------------------------------------------------------
+
+
+class Session:
+    """Unit of work.
+
+    A session keeps track of the changes made to table rows, as well as of
+    the rows to insert and delete, and writes them to the database in batches
+    when flushed. Pending changes are grouped by table and by the set of
+    affected columns, so that each group is written with a single
+    ``executemany`` call. Inserts and updates are performed on referenced
+    tables first, while deletes are performed on referencing tables first, as
+    determined by the table foreign keys.
+
+    Sessions are created with :func:`sibilla.Database.session` and are meant
+    to be used as context managers. Changes to the columns of
+    :class:`sibilla.table.TableRow` objects made within the context, by the
+    thread that entered it, are tracked automatically. On exit, the session
+    is committed, unless an exception has been raised, in which case it is
+    rolled back.
+
+    Example:
+        >>> with db.session() as session:
+        ...     student = db.students["20060105"]
+        ...     student.surname = "Stevenson"
+        ...     session.insert(db.modules, {"code": "CM0005", "name": "OS"})
+        ...     session.delete(db.students["20060104"])
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+        self._dirty = {}
+        self._new = []
+        self._deleted = {}
+        self._lock = threading.RLock()
+        self._previous = None
+
+    def add(self, row):
+        """Track the changes made to the given table row."""
+        if not hasattr(row, "_apply_changes"):
+            raise SessionError("Cannot track changes to {}".format(row))
+
+        with self._lock:
+            self._dirty[id(row)] = row
+
+    def insert(self, table, values):
+        """Schedule the insertion of values into the given table.
+
+        The values are in the same format accepted by
+        :func:`sibilla.table.Table.insert`.
+        """
+        with self._lock:
+            self._new += [
+                (table, v)
+                for v in (values if isinstance(values, list) else [values])
+            ]
+
+    def delete(self, row):
+        """Schedule the deletion of the given table row."""
+        if not row.__pk__:
+            raise SessionError("Cannot delete {} without a primary key".format(
+                row
+            ))
+
+        with self._lock:
+            self._dirty.pop(id(row), None)
+            self._deleted[id(row)] = row
+
+    def flush(self):
+        """Write all the pending changes to the database.
+
+        The changes are not committed.
+        """
+        with self._lock:
+            dirty = [r for r in self._dirty.values() if r.__changes__]
+
+            # Validate all the primary keys before writing anything
+            keys = {
+                id(r): tuple(self._pk(r))
+                for r in dirty + list(self._deleted.values())
+            }
+
+            tables = _dependency_order(list({
+                id(t): t for t in [t for t, _ in self._new] + [
+                    r.__dataset__
+                    for r in dirty + list(self._deleted.values())
+                ]
+            }.values()))
+
+            for table in tables:
+                groups = {}
+                for t, values in self._new:
+                    if t is table:
+                        groups.setdefault(
+                            tuple(values) if isinstance(values, dict)
+                            else None,
+                            []
+                        ).append(values)
+
+                for batch in groups.values():
+                    table.insert(batch)
+
+                groups = {}
+                for row in dirty:
+                    if row.__dataset__ is table:
+                        changes = row.__changes__
+                        groups.setdefault(tuple(sorted(changes)), []).append(
+                            row
+                        )
+
+                for columns, rows in groups.items():
+                    self._check(table, rows, table._update_by_pk(
+                        columns,
+                        [
+                            tuple(r.__changes__[c] for c in columns)
+                            + keys[id(r)]
+                            for r in rows
+                        ]
+                    ))
+
+            for table in reversed(tables):
+                rows = [
+                    r for r in self._deleted.values()
+                    if r.__dataset__ is table
+                ]
+                if rows:
+                    self._check(table, rows, table._delete_by_pk(
+                        [keys[id(r)] for r in rows]
+                    ))
+
+            for row in dirty:
+                row._apply_changes()
+
+            self._clear()
+
+    def commit(self):
+        """Flush the pending changes and commit the transaction."""
+        self.flush()
+        self.db.commit()
+
+    def rollback(self):
+        """Discard the pending changes and roll back the transaction."""
+        with self._lock:
+            for row in self._dirty.values():
+                row._discard_changes()
+
+            self._clear()
+
+        self.db.rollback()
+
+    def _clear(self):
+        self._dirty = {}
+        self._new = []
+        self._deleted = {}
+
+    @staticmethod
+    def _pk(row):
+        pk = row.__pk__
+        if not pk:
+            raise SessionError(
+                "Cannot update {} without a primary key".format(row)
+            )
+
+        return pk.values()
+
+    @staticmethod
+    def _check(table, rows, rowcount):
+        if rowcount != len(rows):
+            raise SessionError(
+                "Expected to change {} rows in {}, but {} changed".format(
+                    len(rows), table, rowcount
+                )
+            )
+
+    def __enter__(self):
+        self._previous = self.db.__session__
+        self.db._units.session = self
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.db._units.session = self._previous
+
+        if exc_type is not None:
+            self.rollback()
+            return
+
+        try:
+            self.commit()
+        except Exception:
+            self.rollback()
+            raise
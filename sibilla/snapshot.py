@@ -0,0 +1,84 @@
+# This file is part of "sibilla" which is released under GPL.
+#
+# See file LICENCE or go to http://www.gnu.org/licenses/ for full license
+# details.
+#
+# Sibilla is a Python ORM for the Oracle Database.
+#
+# Copyright (c) 2019 Gabriele N. Tornetta <phoenix1987@gmail.com>.
+# All rights reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from sibilla import DatabaseError
+
+
+# ---- Exceptions -------------------------------------------------------------
+
+
+class SnapshotError(DatabaseError):
+    """Read-consistent snapshot error."""
+    pass
+
+
+# ---- Classes ----------------------------------------------------------------
+
+
+class Snapshot:
+    """Read-consistent snapshot of the database.
+
+    Snapshots are created with :func:`sibilla.Database.snapshot` and are meant
+    to be used as context managers. Within the context, every query generated
+    by a :class:`sibilla.dataset.DataSet` from the same thread on the same
+    database session is a flashback query ``AS OF SCN`` the system change
+    number captured on entry. Other threads and sessions are not affected.
+    Queries spread across many sessions, like
+    :func:`sibilla.table.Table.parallel_scan`, are generated by the calling
+    thread, and so they are all read as of its snapshot.
+
+    Example:
+        >>> with db.snapshot() as scn:
+        ...     orders = list(db.orders.parallel_scan(workers=4))
+        ...     lines = list(db.order_lines.parallel_scan(workers=4))
+
+    The same snapshot can be shared with other sessions by passing its SCN
+    explicitly, e.g. ``other_db.snapshot(scn)``.
+    """
+
+    def __init__(self, db, scn=None):
+        self.db = db
+        self.scn = scn
+
+        self._previous = None
+
+    def _current_scn(self):
+        try:
+            return self.db.plsql(
+                "select dbms_flashback.get_system_change_number from dual"
+            ).fetchone()[0]
+        except DatabaseError as e:
+            raise SnapshotError(
+                "Cannot determine the current SCN: {}".format(e)
+            ) from e
+
+    def __enter__(self):
+        if self.scn is None:
+            self.scn = self._current_scn()
+
+        self._previous = self.db.__snapshot__
+        self.db._snapshots.scn = self.scn
+
+        return self.scn
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.db._snapshots.scn, self._previous = self._previous, None
@@ -20,7 +20,17 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-from sibilla import DatabaseError
+import datetime
+import queue
+import sys
+import threading
+from collections import namedtuple
+from itertools import islice
+
+import cx_Oracle
+
+from sibilla import (Collection, CursorRow, DatabaseError, FetchHandle,
+                     caching, sql_identifier)
 from sibilla.object import ObjectType, OracleObject
 
 
@@ -49,7 +59,113 @@ class PrimaryKeyError(TableEntryError):
 # -----------------------------------------------------------------------------
 
 
-from sibilla.dataset import DataSet, Row, RowError, RowGetterError
+_RETURNING_BIND = "sibilla_ret"
+
+# Number of rows whose deferred columns are loaded together
+_DEFERRED_CHUNK_SIZE = 100
+
+# Column types that cannot be hashed with ORA_HASH
+_UNHASHABLE_TYPES = (
+    cx_Oracle.DB_TYPE_BLOB,
+    cx_Oracle.DB_TYPE_CLOB,
+    cx_Oracle.DB_TYPE_NCLOB,
+    cx_Oracle.DB_TYPE_LONG,
+    cx_Oracle.DB_TYPE_LONG_RAW,
+)
+
+# Conversions of the hashed columns to text that do not depend on the NLS
+# settings of the session, by column type
+_NUMBER_TEXT = "to_char({}, 'TM9', 'NLS_NUMERIC_CHARACTERS=''.,''')"
+_TEXT_FORMATS = {
+    cx_Oracle.DB_TYPE_NUMBER: _NUMBER_TEXT,
+    cx_Oracle.DB_TYPE_BINARY_INTEGER: _NUMBER_TEXT,
+    cx_Oracle.DB_TYPE_BINARY_FLOAT: _NUMBER_TEXT,
+    cx_Oracle.DB_TYPE_BINARY_DOUBLE: _NUMBER_TEXT,
+    cx_Oracle.DB_TYPE_DATE: "to_char({}, 'YYYY-MM-DD HH24:MI:SS')",
+    cx_Oracle.DB_TYPE_TIMESTAMP: "to_char({}, 'YYYY-MM-DD HH24:MI:SS.FF9')",
+    cx_Oracle.DB_TYPE_TIMESTAMP_TZ:
+        "to_char(sys_extract_utc({}), 'YYYY-MM-DD HH24:MI:SS.FF9')",
+    cx_Oracle.DB_TYPE_TIMESTAMP_LTZ:
+        "to_char(sys_extract_utc({}), 'YYYY-MM-DD HH24:MI:SS.FF9')",
+    cx_Oracle.DB_TYPE_RAW: "rawtohex({})",
+}
+
+
+TableComparison = namedtuple(
+    "TableComparison", ["missing", "extra", "changed"]
+)
+TableComparison.__doc__ = """Result of the comparison between two tables.
+
+The rows are given by their key values, as tuples.
+"""
+
+
+from sibilla.dataset import (DataSet, Row, RowAttributeError, RowError,
+                             RowGetterError, _compile_where, _resolve_where,
+                             _split_operator)
+
+
+def _equality_conditions(where, kwargs):
+    """Extract the conditions of a query that only tests columns for equality.
+
+    Returns ``None`` if the query has other kind of conditions.
+    """
+    if where is None:
+        conditions = kwargs
+    elif (
+        isinstance(where, tuple) and not kwargs
+        and all(isinstance(e, dict) for e in where)
+    ):
+        conditions = {}
+        for e in where:
+            if set(e) & set(conditions):
+                return None
+            conditions.update(e)
+    else:
+        return None
+
+    for k, v in conditions.items():
+        if _split_operator(k)[1] not in (None, "eq"):
+            return None
+        if v is None or isinstance(v, (list, tuple, dict, set, frozenset)) or (
+            isinstance(v, str) and '%' in v
+        ):
+            return None
+
+    conditions = {_split_operator(k)[0]: v for k, v in conditions.items()}
+
+    return {sql_identifier(k): v for k, v in conditions.items()}
+
+
+def _stored_conditions(description, conditions):
+    """Adapt equality conditions to the rows of an in-memory table copy.
+
+    Dates are compared as the datetimes that the rows hold. Returns ``None``
+    if the conditions test blank-padded ``CHAR`` columns, whose comparison
+    semantics depend on the values, so that they are answered by the
+    database instead.
+    """
+    types = {c[0]: c[1] for c in description}
+    adapted = {}
+    for k, v in conditions.items():
+        if types.get(k) in (cx_Oracle.DB_TYPE_CHAR, cx_Oracle.DB_TYPE_NCHAR):
+            return None
+        if type(v) is datetime.date:
+            v = datetime.datetime(v.year, v.month, v.day)
+        adapted[k] = v
+
+    return adapted
+
+
+def _inline_lobs(cursor, name, default_type, size, precision, scale):
+    # Fetch LOB values inline, rather than as locators that take a round trip
+    # each to be read.
+    if default_type in (cx_Oracle.DB_TYPE_CLOB, cx_Oracle.DB_TYPE_NCLOB):
+        return cursor.var(cx_Oracle.DB_TYPE_LONG, arraysize=cursor.arraysize)
+    if default_type == cx_Oracle.DB_TYPE_BLOB:
+        return cursor.var(
+            cx_Oracle.DB_TYPE_LONG_RAW, arraysize=cursor.arraysize
+        )
 
 
 class TableRow(Row):
@@ -57,10 +173,105 @@ class TableRow(Row):
 
     Contrary to a normal row, a table row can have a primary key associated to
     it.
+
+    Columns of a table row can be assigned new values within a
+    :class:`sibilla.session.Session` (see :func:`Database.session`). Changes
+    are recorded on the row, and are written to the database by the session
+    active in the current thread. Assignments outside of a session raise
+    :class:`sibilla.dataset.RowAttributeError`, as they would never be
+    written.
+
+    Example:
+        >>> with db.session():
+        ...     customer = db.customer[42]
+        ...     customer.name = "Arthur Dent"
     """
 
     __slots__ = []
 
+    def __setattr__(self, name, value):
+        if name.startswith("_") or name == "cache":
+            return super().__setattr__(name, value)
+
+        column = sql_identifier(name)
+        if column not in self.__dataset__.__cols__:
+            raise RowAttributeError(
+                "No column named '{}' in {}.".format(name, self.__dataset__)
+            )
+
+        session = self.db.__session__
+        if session is None:
+            raise RowAttributeError(
+                "Cannot change {} of {} outside of a session.".format(
+                    name, self.__dataset__
+                )
+            )
+
+        self.__dict__.setdefault("_changes", {})[column] = value
+        self._forget(column)
+        session.add(self)
+
+    def __field__(self, name):
+        changes = self.__dict__.get("_changes")
+        if changes:
+            try:
+                return changes[sql_identifier(name)]
+            except KeyError:
+                pass
+
+        try:
+            return super().__field__(name)
+        except KeyError:
+            # Load the columns left out of the query that fetched the row, if
+            # any, together with the other rows of the same chunk.
+            record = self._get_record()
+            missing = [
+                c for c in self.__dataset__.__cols__ if c not in record._state
+            ]
+            if sql_identifier(name) not in missing:
+                raise
+
+            self.__dataset__._load_deferred(
+                self.__dict__.get("_chunk") or [self], missing
+            )
+
+            return super().__field__(name)
+
+    def _forget(self, column):
+        # Remove the cached attribute values for the given column
+        self.cache.discard(
+            lambda key: len(key) == 1
+            and isinstance(key[0], str)
+            and key[0].upper() == column
+        )
+
+    def _apply_changes(self):
+        # Merge the pending changes into the row record
+        changes = self.__dict__.pop("_changes", None)
+        if not changes:
+            return
+
+        self._merge(changes)
+
+    def _merge(self, values):
+        # Merge the given column values into the row record
+        record = self._get_record()
+        state = dict(zip(record._cols, record.__raw__))
+        state.update(values)
+
+        self._set_record(
+            CursorRow(None, tuple(state.values()), list(state.keys()))
+        )
+
+    def _discard_changes(self):
+        for column in self.__dict__.pop("_changes", {}):
+            self._forget(column)
+
+    @property
+    def __changes__(self):
+        """The pending changes to the row, as a dictionary."""
+        return dict(self.__dict__.get("_changes", {}))
+
     @property
     def __pk__(self):
         record = self._get_record()
@@ -102,13 +313,32 @@ class Table(OracleObject, DataSet):
     A table is a data set that can have primary and foreign key constraints.
     For tables with a primary key constraint, rows can be accessed from a table
     as if this was indexed by the primary key values.
+
+    Columns can be deferred with :func:`set_deferred`, e.g. large LOB
+    columns, so that they are left out of the queries made with the
+    ``fetch_*`` methods. Deferred columns are loaded on first access, with a
+    single query for every chunk of fetched rows. The same happens for the
+    columns left out of the default projection (see
+    :func:`sibilla.dataset.DataSet.set_columns`).
+
+    Rows accessed by primary key are kept in a bounded identity map, so that
+    accessing the same row again (e.g. when following foreign keys with
+    :class:`SmartRow`) returns the same object without querying the database.
+    The identity map is cleared at the end of every transaction and whenever
+    the table is modified through any of its methods. Its size can be set with
+    :func:`sibilla.caching.set_identity_map_size`. Tables looked up through a
+    :class:`sibilla.pool.LocalDatabase` have no identity map.
     """
 
     __row_class__ = TableRow
 
     __table__ = None
+    __deferred__ = []
     __pk = None
     __fk = None
+    __identity_map = None
+    __store = None
+    __store_spec = None
 
     def __init__(self, db, name=None, schema=None):
         name = name or self.__table__
@@ -118,6 +348,86 @@ class Table(OracleObject, DataSet):
 
         super().__init__(db, name, ObjectType.TABLE, schema)
 
+    @classmethod
+    def set_deferred(cls, *columns):
+        """Set the columns to defer.
+
+        Example:
+            >>> class Document(Table):
+            ...     __table__ = "document"
+            >>> Document.set_deferred("content")
+            >>> for doc in db.document.fetch_all(owner="arthur"):
+            ...     print(doc.title)  # Content not fetched
+        """
+        cls.__deferred__ = [sql_identifier(c) for c in columns]
+
+    def _projection(self, select):
+        if select != "*" or not (self.__columns__ or self.__deferred__):
+            return super()._projection(select)
+
+        # The primary key is always selected, as it is required to load the
+        # other columns.
+        pk = self.__pk__ or []
+        columns = [
+            sql_identifier(c) for c in self.__columns__ or self.__cols__
+        ]
+
+        return [c for c in pk if c not in columns] + [
+            c for c in columns if c in pk or c not in self.__deferred__
+        ]
+
+    def _load_deferred(self, rows, columns):
+        # Load the given columns of the rows with a single query
+        pk = self.__pk__
+        if not pk:
+            raise TableError(
+                "Cannot load columns {} of table {} without a primary key"
+                .format(", ".join(columns), self.name)
+            )
+
+        records = {}
+        for row in rows:
+            record = row._get_record()
+            if not any(c in record._state for c in columns):
+                records.setdefault(
+                    tuple(getattr(record, k) for k in pk), []
+                ).append(row)
+
+        statement, binds = self._generate_select_statement(
+            pk + columns,
+            ({pk[0]: [k[0] for k in records]},) if len(pk) == 1
+            else [dict(zip(pk, k)) for k in records]
+        )
+
+        cursor = self.db.cursor()
+        cursor.outputtypehandler = _inline_lobs
+        try:
+            cursor.execute(
+                statement, {k: self.db._bind(v) for k, v in binds.items()}
+            )
+            for values in cursor:
+                for row in records.get(tuple(values[:len(pk)]), []):
+                    row._merge(dict(zip(columns, values[len(pk):])))
+        except cx_Oracle.DatabaseError as e:
+            raise DatabaseError(e) from e
+        finally:
+            cursor.close()
+
+    def _chunked(self, rows):
+        # Group the fetched rows in chunks, whose deferred columns are loaded
+        # together.
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, _DEFERRED_CHUNK_SIZE))
+            if not chunk:
+                return
+
+            for row in chunk:
+                if isinstance(row, TableRow):
+                    row.__dict__["_chunk"] = chunk
+
+            yield from chunk
+
     @property
     def __pk__(self):
         """The table primary key description."""
@@ -171,6 +481,445 @@ class Table(OracleObject, DataSet):
 
         return self.__fk
 
+    @property
+    def __identity_map__(self):
+        """The identity map of the rows accessed by primary key."""
+        if self.__identity_map is None:
+            self.__identity_map = caching.SynchronizedTTLCache(
+                caching._identity_map_size
+            )
+            self.db._on_transaction_end(self)
+
+        return self.__identity_map
+
+    def _end_transaction(self):
+        if self.__identity_map is not None:
+            self.__identity_map.flush()
+
+    def invalidate(self):
+        """Discard any cached state of the table.
+
+        This is done automatically whenever the table is modified through any
+        of its methods. Call this method to synchronise with changes made by
+        other means, e.g. with plain SQL statements. Cached query results are
+        discarded, and an in-memory copy of the table, if any, is reloaded on
+        the next access.
+        """
+        self._end_transaction()
+        self.__store = None
+        self.db.result_cache.invalidate(self.name)
+
+    def cache_all(self, indexes=None, ttl=None):
+        """Keep a copy of the whole table in memory.
+
+        This is meant for small reference tables that are accessed very
+        frequently. The table content is loaded with a single query and kept
+        in memory, together with hash indexes on the primary key and on the
+        given columns. Access by primary key, as well as queries made with
+        :func:`fetch_one`, :func:`fetch_many` and :func:`fetch_all` that only
+        test columns for equality, are then answered without querying the
+        database.
+
+        The in-memory copy is reloaded after ``ttl`` seconds, or when the
+        table is invalidated (see :func:`invalidate`).
+
+        Example:
+            >>> db.country.cache_all(indexes=["iso_code"])
+            >>> db.country.fetch_one(iso_code="GB")
+
+        Args:
+            indexes (list): The columns to index. Use a tuple of column names
+                to build an index on multiple columns.
+            ttl (int): The number of seconds after which the table is
+                reloaded. By default, the TTL set in
+                :mod:`sibilla.caching` is used.
+
+        Raises:
+            TableError: if the table is shared by sessions with different
+                transactions (see :class:`sibilla.pool.LocalDatabase`).
+        """
+        if self.db.__shared__:
+            raise TableError(
+                "In-memory copies of table {} cannot be shared by many "
+                "sessions".format(self.name)
+            )
+
+        self.__store_spec = (
+            ([self.__pk__] if self.__pk__ else []) + [
+                [sql_identifier(c) for c in index]
+                if isinstance(index, (list, tuple))
+                else [sql_identifier(index)]
+                for index in indexes or []
+            ],
+            ttl
+        )
+        self.__store = None
+        self._get_store()
+
+    def uncache_all(self):
+        """Discard the in-memory copy of the table, if any."""
+        self.__store_spec = None
+        self.__store = None
+
+    def _get_store(self):
+        if self.__store_spec is None:
+            return None
+
+        store = self.__store
+        if store is None or store.expired:
+            indexes, ttl = self.__store_spec
+            cursor = self.db.plsql("select * from " + self.name)
+            store = self.__store = caching.IndexedStore(
+                cursor.description, cursor.fetchall(), indexes, ttl
+            )
+
+        return store
+
+    def _fetch_stored(self, select, where, order_by, kwargs):
+        # Answer queries with equality conditions only from the in-memory
+        # copy of the table, if any, with the description of its rows.
+        if select != "*" or order_by is not None \
+                or self.db.__snapshot__ is not None:
+            return None
+
+        store = self._get_store()
+        if store is None:
+            return None
+
+        conditions = _equality_conditions(where, kwargs)
+        if conditions is None:
+            return None
+
+        conditions = _stored_conditions(store.description, conditions)
+        if conditions is None:
+            return None
+
+        try:
+            return store.description, store.lookup(conditions)
+        except KeyError:
+            # Not a column
+            return None
+
+    def fetch_one(
+        self, select="*", where=None, order_by=None, hints=None,
+        call_timeout=None, **kwargs
+    ):
+        stored = self._fetch_stored(select, where, order_by, kwargs)
+        if stored is None:
+            return super().fetch_one(
+                select, where, order_by, hints, call_timeout, **kwargs
+            )
+
+        return self._wrap_raw(*stored, one=True)
+
+    def fetch_all(
+        self, select="*", where=None, order_by=None, hints=None,
+        prefetch=None, arraysize=None, prefetchrows=None, call_timeout=None,
+        cancellable=False, **kwargs
+    ):
+        stored = self._fetch_stored(select, where, order_by, kwargs)
+        if stored is None:
+            rows = super().fetch_all(
+                select, where, order_by, hints, prefetch, arraysize,
+                prefetchrows, call_timeout, cancellable, **kwargs
+            )
+            if self._projection(select) == "*":
+                return rows
+            if cancellable:
+                return rows.derive(self._chunked)
+            return self._chunked(rows)
+
+        rows = self._iter_raw(*stored)
+        return FetchHandle(self.db, None, rows) if cancellable else rows
+
+    def fetch_many(
+        self, n, select="*", where=None, order_by=None, hints=None,
+        call_timeout=None, **kwargs
+    ):
+        stored = self._fetch_stored(select, where, order_by, kwargs)
+        if stored is None:
+            rows = super().fetch_many(
+                n, select, where, order_by, hints, call_timeout, **kwargs
+            )
+            for row in rows:
+                if isinstance(row, TableRow):
+                    row.__dict__["_chunk"] = rows
+            return rows
+
+        description, rows = stored
+        return self._wrap_raw(description, rows[:n])
+
+    def _scan_chunks(self, split, chunks):
+        # Divide the table into chunks, each given by the partition to select
+        # from, an extra condition and its bind values.
+        if split == "rowid":
+            # The ROWID ranges are derived from the extents of the table
+            # segments, so that no rows are read to compute them. The
+            # extents of other schemas are only listed by the DBA views.
+            dba = self.__schema__ or self.db.__scope__ == "dba"
+            extents = self.db.plsql("""
+                select rowidtochar(dbms_rowid.rowid_create(
+                           1, o.data_object_id, e.relative_fno, e.block_id, 0
+                       )),
+                       rowidtochar(dbms_rowid.rowid_create(
+                           1, o.data_object_id, e.relative_fno,
+                           e.block_id + e.blocks - 1, 32767
+                       )),
+                       e.blocks
+                from   {0}_extents e
+                join   {0}_objects o
+                on     o.object_name = e.segment_name
+                   and o.object_type = e.segment_type
+                   and decode(o.subobject_name, e.partition_name, 1) = 1
+                   {1}
+                where  e.segment_name = :tab
+                   and e.segment_type like 'TABLE%'
+                order by o.data_object_id, e.relative_fno, e.block_id
+            """.format(
+                "dba" if dba else "user",
+                (
+                    "and o.owner = e.owner and e.owner = '{}'".format(
+                        self.__schema__ or self.db.username.upper()
+                    )
+                ) if dba else ""
+            ), tab=self.name).fetchall()
+
+            if not extents:
+                # No segment yet, e.g. with deferred segment creation
+                return [(None, None, {})]
+
+            # Group the consecutive extents into chunks of about the same
+            # number of blocks.
+            size = sum(blocks for _, _, blocks in extents) / chunks
+            ranges = []
+            lo = hi = None
+            total = 0
+            for extent_lo, extent_hi, blocks in extents:
+                lo = lo or extent_lo
+                hi = extent_hi
+                total += blocks
+                if total >= size * (len(ranges) + 1):
+                    ranges.append((lo, hi))
+                    lo = None
+            if lo is not None:
+                ranges.append((lo, hi))
+
+            return [(
+                None,
+                "rowid between chartorowid(:sibilla_lo) "
+                "and chartorowid(:sibilla_hi)",
+                {"sibilla_lo": lo, "sibilla_hi": hi}
+            ) for lo, hi in ranges]
+
+        if split == "hash":
+            return [(
+                None,
+                "ora_hash(rowid, :sibilla_buckets) = :sibilla_bucket",
+                {"sibilla_buckets": chunks - 1, "sibilla_bucket": bucket}
+            ) for bucket in range(chunks)]
+
+        if split == "partition":
+            partitions = self.db.plsql("""
+                select partition_name
+                from   {}_tab_partitions
+                where  table_name = :tab
+                   {}
+                order by partition_position
+            """.format(
+                "all" if self.__schema__ else self.db.__scope__,
+                ("and table_owner = '" + self.__schema__ + "'")
+                if self.__schema__ else ""
+            ), tab=self.name).fetchall()
+
+            if not partitions:
+                raise TableError(
+                    "Table {} is not partitioned".format(self.name)
+                )
+
+            return [(p, None, {}) for p, in partitions]
+
+        raise TableError("Invalid split method: {}".format(split))
+
+    def parallel_scan(
+        self, workers=4, split="rowid", select="*", where=None, hints=None,
+        ordered=False, chunks=None, pool=None, scn=None, **kwargs
+    ):
+        """Scan the table in parallel over many pooled sessions.
+
+        The table is divided into chunks, which are fetched concurrently by
+        ``workers`` sessions acquired from a
+        :class:`sibilla.pool.SessionPool`. The rows of all the chunks are
+        merged into a single iterator, either in chunk order or as soon as
+        they are available. Each worker reuses a single session for all its
+        chunks, whose rows are streamed in batches of ``arraysize`` rows (see
+        :func:`sibilla.dataset.DataSet.set_fetch_size`), so that at most two
+        batches per worker are held in memory at any time. All the chunks are
+        read as of the same system change number: either the given ``scn``,
+        or the one of the snapshot of the calling thread, if any (see
+        :func:`sibilla.Database.snapshot`).
+
+        The table can be split by
+
+        - ``"rowid"``: into ranges of ROWIDs with about the same number of
+          blocks each, derived from the extents of the table. For tables in
+          other schemas, this requires access to ``DBA_EXTENTS``;
+        - ``"hash"``: into buckets of the ``ORA_HASH`` of the ROWIDs. As each
+          bucket takes a full scan of the table, there is one per worker by
+          default;
+        - ``"partition"``: into its partitions.
+
+        Example:
+            >>> with pool.session() as db:
+            ...     for row in db.orders.parallel_scan(workers=8, status="OPEN"):
+            ...         export(row)
+
+        Args:
+            workers (int): The number of sessions to use.
+            split (str): The split method.
+            select (list): The columns to select.
+            where: The where clause, as for
+                :func:`sibilla.dataset.DataSet.fetch_all`.
+            hints (list): The optimizer hints.
+            ordered (bool): Whether to return the rows in chunk order.
+            chunks (int): The number of chunks for the ``"rowid"`` and
+                ``"hash"`` split methods. Defaults to four per worker for
+                ``"rowid"``, and to one per worker for ``"hash"``.
+            pool (:class:`sibilla.pool.SessionPool`): The pool to acquire the
+                sessions from. Defaults to the pool of the table database.
+            scn (int): The system change number to read the chunks as of.
+            **kwargs: The conditions, as for
+                :func:`sibilla.dataset.DataSet.fetch_all`.
+
+        Returns:
+            generator: the rows of the table.
+        """
+        pool = pool or self.db.__pool__
+        if pool is None:
+            raise TableError(
+                "Parallel scans require a database session from a pool"
+            )
+
+        if not where and kwargs:
+            where = (kwargs,)
+
+        names = []
+        shape, values = _resolve_where(where) if where else (None, [])
+        where = _compile_where(shape, names) if where else None
+        binds = dict(zip(names, values))
+
+        select = self._projection(select)
+        hints = tuple(self.__hints__) + tuple(hints or [])
+        if chunks is None:
+            chunks = workers if split == "hash" else 4 * workers
+
+        # The sources are determined here, by the calling thread, so that all
+        # the chunks are read as of the same snapshot, if any.
+        def chunk_sources():
+            return [
+                (self._source(partition), condition, chunk_binds)
+                for partition, condition, chunk_binds
+                in self._scan_chunks(split, chunks)
+            ]
+
+        if scn is None:
+            chunk_list = chunk_sources()
+        else:
+            with self.db.snapshot(scn):
+                chunk_list = chunk_sources()
+
+        # Each worker holds one session for the whole scan and streams the
+        # rows of its chunks, in batches of arraysize rows, into bounded
+        # queues: one per chunk if ordered, a shared one otherwise.
+        work = queue.Queue()
+        for i, chunk in enumerate(chunk_list):
+            work.put((i, chunk))
+        outputs = (
+            [queue.Queue(maxsize=2) for _ in chunk_list] if ordered
+            else [queue.Queue(maxsize=2 * workers)] * len(chunk_list)
+        )
+        stop = threading.Event()
+        errors = []
+
+        def put(i, item):
+            while not stop.is_set():
+                try:
+                    outputs[i].put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    pass
+
+        def scan():
+            try:
+                with pool.session() as db:
+                    while not stop.is_set():
+                        try:
+                            i, chunk = work.get_nowait()
+                        except queue.Empty:
+                            return
+
+                        (source, source_binds), condition, chunk_binds = chunk
+                        statement = self._format_select(
+                            select,
+                            " and ".join(c for c in (where, condition) if c),
+                            None,
+                            hints,
+                            source=source
+                        )
+
+                        cursor = db.plsql(
+                            statement, arraysize=self.__arraysize__,
+                            **binds, **chunk_binds, **source_binds
+                        )
+                        try:
+                            while not stop.is_set():
+                                rows = cursor.fetchmany()
+                                if not rows:
+                                    break
+                                put(i, (cursor.description, rows))
+                        finally:
+                            cursor.close()
+
+                        put(i, None)  # End of chunk
+            except Exception as e:
+                errors.append(e)
+
+        def get(output):
+            while True:
+                try:
+                    return output.get(timeout=0.1)
+                except queue.Empty:
+                    if errors:
+                        e = errors[0]
+                        if isinstance(e, cx_Oracle.DatabaseError):
+                            raise DatabaseError(e) from e
+                        raise e
+
+        def row_generator():
+            threads = [
+                threading.Thread(target=scan, daemon=True)
+                for _ in range(min(workers, len(chunk_list)))
+            ]
+            for thread in threads:
+                thread.start()
+
+            try:
+                for output in outputs if ordered else outputs[:1]:
+                    remaining = 1 if ordered else len(chunk_list)
+                    while remaining:
+                        item = get(output)
+                        if item is None:
+                            remaining -= 1
+                            continue
+
+                        description, rows = item
+                        yield from self._iter_raw(description, rows)
+            finally:
+                stop.set()
+                for thread in threads:
+                    thread.join()
+
+        return row_generator()
+
     def _get_by_pk(self, pk):
         if type(pk) not in (list, tuple):
             pk = (pk, )
@@ -181,11 +930,32 @@ class Table(OracleObject, DataSet):
                 "(expected {})".format(self.name, repr(self.__pk__))
             )
 
+        # Rows read within a snapshot are historical, so they are neither
+        # taken from nor added to the identity map and the in-memory copy.
+        # Neither are those read by sessions with different transactions.
+        uncached = self.db.__shared__ or self.db.__snapshot__ is not None
+        mapped = not uncached and caching._identity_map_size
+
+        key = (self.__row_class__, tuple(pk))
+        if mapped:
+            identity_map = self.__identity_map__
+            with identity_map._lock:
+                row = identity_map.get(key)
+            if row is not None:
+                return row
+
         try:
-            return self.__row_class__(
-                self,
-                dict(list(zip(self.__pk__, pk)))
+            store = None if uncached else self._get_store()
+            conditions = store and _stored_conditions(
+                store.description, dict(zip(self.__pk__, pk))
             )
+            if conditions is None:
+                row = self.__row_class__(
+                    self,
+                    dict(list(zip(self.__pk__, pk)))
+                )
+            else:
+                row = self._get_stored_row(store, conditions)
         except RowError:
             raise PrimaryKeyError(
                 "No entry with PK '{}' in table {}".format(
@@ -194,6 +964,28 @@ class Table(OracleObject, DataSet):
                 )
             )
 
+        if not mapped:
+            return row
+
+        with identity_map._lock:
+            return identity_map.setdefault(key, row)
+
+    def _get_stored_row(self, store, conditions):
+        # The row of the in-memory copy with the given primary key, which is
+        # wrapped once for the lifetime of the copy.
+        rows = store.lookup(conditions)
+        if not rows:
+            raise RowError()
+
+        key = (self.__row_class__, id(rows[0]))
+        row = store.objects.get(key)
+        if row is None:
+            row = store.objects.setdefault(
+                key, self._wrap_raw(store.description, rows, one=True)
+            )
+
+        return row
+
     def __getitem__(self, pk):
         def row_generator():
             for n in range(pk.start, pk.stop, pk.step):
@@ -216,16 +1008,75 @@ class Table(OracleObject, DataSet):
         synchronised with the database.
         """
         self.db.plsql('drop table {}'.format(self.name))
+        self.invalidate()
         if flush_cache:
             self.db.cache.flush()
 
-    def insert(self, values):
+    def insert(
+        self, values, direct=False, nologging=False, commit_every=None,
+        batch_size=None, returning=None, as_rows=False, sequences=None
+    ):
         """Insert values into the table.
 
         The passed values can either be a single row to add or a list of
         multiple row to insert as a batch. A row in this case is either a
         dictionary with the name of the columns and the corresponding values
         to set, or a tuple with as many entries as the columns of the table.
+
+        Bulk loads, e.g. into staging tables, can use a direct-path insert by
+        passing ``direct=True``. Rows are then written above the high-water
+        mark with the ``APPEND_VALUES`` hint, bypassing the buffer cache.
+        Oracle does not allow a table loaded in direct-path mode to be read or
+        modified again within the same transaction (ORA-12838). Therefore, in
+        this mode, every batch is committed as soon as it has been inserted.
+        With ``nologging=True`` the table is also switched to ``NOLOGGING``
+        for the duration of the load, to reduce the amount of redo generated.
+        Bear in mind that this is done with ``ALTER TABLE`` statements, which
+        are DDL and thus implicitly commit any pending transaction of the
+        session, before the load and again after it. Moreover, the loaded data
+        cannot be recovered from the redo logs, so this is only suitable for
+        data that can be reloaded.
+
+        A list of values is sent to the database in batches of ``batch_size``
+        rows (by default, ``commit_every`` or all of them at once). When
+        ``commit_every`` is given, the transaction is committed every time at
+        least that many rows have been inserted since the last commit. Should
+        an error occur, the raised :class:`TableInsertError` reports how many
+        rows have already been committed.
+
+        Values generated by the database (e.g. by identity columns, sequences
+        or triggers) can be retrieved with the ``returning`` argument, without
+        the need to query the table again. In this case, the method returns
+        the values of the requested columns as a tuple for every inserted row,
+        in the same order as the given values. With ``as_rows=True``, rows of
+        the table row class are returned instead, made up of the inserted and
+        the returned values.
+
+        Key columns can be populated from sequences with the ``sequences``
+        argument, a dictionary that maps column names to
+        :class:`sibilla.sequence.Sequence` objects. The values for all the rows
+        are taken from each sequence at once, thus avoiding a round trip per
+        row. Combine it with ``returning`` to get the assigned keys back.
+
+        Args:
+            values: The row or the list of rows to insert.
+            direct (bool): Whether to perform a direct-path insert.
+            nologging (bool): Whether to load the table in ``NOLOGGING`` mode.
+                Requires ``direct=True``.
+            commit_every (int): The number of rows after which the transaction
+                is committed.
+            batch_size (int): The number of rows to send to the database with
+                every round trip.
+            returning (list): The names of the columns whose values are to be
+                returned for every inserted row.
+            as_rows (bool): Whether to return rows instead of tuples of
+                returned values.
+            sequences (dict): The sequences to take the values of the given
+                columns from.
+
+        Returns:
+            The returned values, if ``returning`` is given, either as a single
+            item or as a list, according to the type of ``values``.
         """
         def generate_insert_stmt(v, gen_kwargs=True):
             if isinstance(v, dict):
@@ -250,29 +1101,333 @@ class Table(OracleObject, DataSet):
             else:
                 raise TableInsertError("Invalid type for values to insert.")
 
-            return "insert into {} {}values ({})".format(
+            return "insert {}into {} {}values ({})".format(
+                "/*+ APPEND_VALUES */ " if direct else "",
                 self.name, insert_columns, insert_values
             ), insert_kwargs
 
         if not values:
-            return
+            return [] if returning and isinstance(values, list) else None
 
-        try:
-            # TODO: executemany doesn't support generators yet.
-            #       See https://github.com/oracle/python-cx_Oracle/issues/200
-            is_list = isinstance(values, list)
-            insert_stmt, insert_kwargs = generate_insert_stmt(
-                values[0] if is_list else values,
-                not is_list
+        if nologging and not direct:
+            raise TableInsertError("NOLOGGING loads require direct=True.")
+
+        if direct and returning:
+            raise TableInsertError(
+                "RETURNING is not supported by direct-path inserts."
             )
-            self.db.plsql(
-                insert_stmt,
-                batch=values if isinstance(values, list) else None,
-                **insert_kwargs
+
+        for size in (commit_every, batch_size):
+            if size is not None and size < 1:
+                raise TableInsertError("Invalid batch size: {}".format(size))
+
+        if sequences:
+            values = self._assign_keys(values, sequences)
+
+        # TODO: executemany doesn't support generators yet.
+        #       See https://github.com/oracle/python-cx_Oracle/issues/200
+        is_list = isinstance(values, list)
+        insert_stmt, insert_kwargs = generate_insert_stmt(
+            values[0] if is_list else values,
+            not is_list
+        )
+        rows = values if is_list else [values]
+        step = batch_size or commit_every or len(rows)
+        batches = [rows[i:i + step] for i in range(0, len(rows), step)]
+
+        if returning:
+            returning = [sql_identifier(c) for c in returning]
+            types = {c[0]: c[1] for c in self.describe()}
+            try:
+                out_types = [types[c] for c in returning]
+            except KeyError as e:
+                raise TableInsertError("No such column: {}".format(e)) from e
+            insert_stmt += " returning {} into {}".format(
+                ", ".join(returning),
+                ", ".join([":" + _RETURNING_BIND + str(i)
+                           for i in range(len(returning))])
             )
+
+        committed = pending = 0
+        returned = []
+        try:
+            if nologging:
+                self.db.plsql("alter table {} nologging".format(self.name))
+
+            for batch in batches:
+                if returning:
+                    returned += self._insert_returning(
+                        insert_stmt, batch, out_types
+                    )
+                else:
+                    self.db.plsql(
+                        insert_stmt,
+                        batch=batch if is_list else None,
+                        **insert_kwargs
+                    )
+
+                pending += len(batch)
+                if direct or (commit_every and pending >= commit_every):
+                    self.db.commit(flush_cache=False)
+                    committed += pending
+                    pending = 0
+
         except DatabaseError as e:
-            raise TableInsertError(e) from e
+            raise TableInsertError(
+                "{} ({} rows committed)".format(e, committed)
+                if committed else e
+            ) from e
+
+        finally:
+            self.invalidate()
+            if nologging:
+                error = sys.exc_info()[1]
+                try:
+                    self.db.plsql("alter table {} logging".format(self.name))
+                except DatabaseError as e:
+                    # The error of the load, if any, takes precedence
+                    if error is None:
+                        raise TableInsertError(
+                            "Cannot restore LOGGING on {}: {}".format(
+                                self.name, e
+                            )
+                        ) from e
+
+        if commit_every and pending:
+            self.db.commit(flush_cache=False)
+
+        if not returning:
+            return None
+
+        if as_rows:
+            returned = [
+                self._make_row(row, returning, ret)
+                for row, ret in zip(rows, returned)
+            ]
+
+        return returned if is_list else returned[0]
+
+    def _assign_keys(self, values, sequences):
+        rows = values if isinstance(values, list) else [values]
+
+        for column, sequence in sequences.items():
+            keys = sequence.take(len(rows))
+
+            if isinstance(rows[0], dict):
+                rows = [dict(row, **{column: key})
+                        for row, key in zip(rows, keys)]
+            elif isinstance(rows[0], tuple):
+                try:
+                    i = self.__cols__.index(sql_identifier(column))
+                except ValueError as e:
+                    raise TableInsertError(
+                        "No such column: {}".format(column)
+                    ) from e
+                rows = [row[:i] + (key,) + row[i + 1:]
+                        for row, key in zip(rows, keys)]
+
+        return rows if isinstance(values, list) else rows[0]
+
+    def _insert_returning(self, stmt, batch, out_types):
+        # Use array out-binds to collect the returned values of a batch
+        try:
+            with self.db.cursor() as cursor:
+                out_vars = [
+                    cursor.var(t, arraysize=len(batch)) for t in out_types
+                ]
+                cursor.setinputsizes(**{
+                    _RETURNING_BIND + str(i): v
+                    for i, v in enumerate(out_vars)
+                })
+                cursor.executemany(stmt, [
+                    v if isinstance(v, dict) else dict(zip(self.__cols__, v))
+                    for v in batch
+                ])
+
+                return [
+                    tuple(var.getvalue(i)[0] for var in out_vars)
+                    for i in range(len(batch))
+                ]
+        except cx_Oracle.DatabaseError as e:
+            raise DatabaseError(e) from e
+
+    def _make_row(self, values, columns, returned):
+        # Build a row out of the inserted and the returned values, without
+        # querying the table.
+        if isinstance(values, dict):
+            state = {sql_identifier(k): v for k, v in values.items()}
+        else:
+            state = dict(zip(self.__cols__, values))
+        state.update(zip(columns, returned))
+
+        record = CursorRow(None, tuple(state.values()), list(state.keys()))
+
+        return (
+            self.__row_class__(self, record) if self.__row_class__ else record
+        )
+
+    def _update_by_pk(self, columns, batch):
+        # Each entry of the batch carries the new column values followed by
+        # the primary key values.
+        n = len(columns)
+        self.invalidate()
+        cursor = self.db.plsql(
+            "update {} set {} where {}".format(
+                self.name,
+                ", ".join(
+                    "{} = :{}".format(c, i + 1) for i, c in enumerate(columns)
+                ),
+                " and ".join(
+                    "{} = :{}".format(k, n + i + 1)
+                    for i, k in enumerate(self.__pk__)
+                )
+            ),
+            batch=batch
+        )
+        return cursor.rowcount
+
+    def _delete_by_pk(self, batch):
+        self.invalidate()
+        cursor = self.db.plsql(
+            "delete from {} where {}".format(
+                self.name,
+                " and ".join(
+                    "{} = :{}".format(k, i + 1)
+                    for i, k in enumerate(self.__pk__)
+                )
+            ),
+            batch=batch
+        )
+        return cursor.rowcount
 
     def truncate(self):
         """Truncate the table."""
         self.db.plsql('truncate table {}'.format(self.name))
+        self.invalidate()
+
+    def _checksum_spec(self, key, columns):
+        # The key and the columns to hash, and the SQL expressions that hash
+        # them. Columns are hashed in name order, so that tables with the
+        # same columns in a different order have the same checksum.
+        # Values are converted to text explicitly, so that the checksums do
+        # not depend on the NLS settings of the session.
+        key = [sql_identifier(c) for c in key or self.__pk__]
+        if not key:
+            raise TableError(
+                "Table {} has no primary key to checksum by".format(self.name)
+            )
+
+        description = self.describe()
+        if columns is None:
+            columns = [
+                c[0] for c in description if c[1] not in _UNHASHABLE_TYPES
+            ]
+        columns = sorted(sql_identifier(c) for c in columns)
+        types = {c[0]: c[1] for c in description}
+
+        def concat(cols):
+            return " || chr(31) || ".join(
+                _TEXT_FORMATS.get(types.get(c.strip('"')), "{}").format(c)
+                for c in cols
+            )
+
+        return key, columns, concat(key), concat(columns)
+
+    def checksum(self, chunks=16, key=None, columns=None):
+        """Compute the checksum of the table by chunks.
+
+        The rows are divided into chunks by the ``ORA_HASH`` of their key and,
+        for every chunk, the number of rows and the sum of the ``ORA_HASH`` of
+        their columns are computed on the server side. LOB and LONG columns
+        are left out.
+
+        Args:
+            chunks (int): The number of chunks.
+            key (list): The columns that identify a row. Defaults to the
+                primary key.
+            columns (list): The columns to hash. Defaults to all of them.
+
+        Returns:
+            dict: the number of rows and the hash sum, by chunk.
+        """
+        _, _, key_expr, row_expr = self._checksum_spec(key, columns)
+        source, binds = self._source()
+
+        return {chunk: (count, total) for chunk, count, total in self.db.plsql(
+            """
+            select chunk, count(*), sum(row_hash)
+            from   (
+                select ora_hash({}, :sibilla_buckets) chunk
+                      ,ora_hash({}) row_hash
+                from   {}
+            )
+            group by chunk
+            """.format(key_expr, row_expr, source),
+            sibilla_buckets=chunks - 1, **binds
+        )}
+
+    def _row_hashes(self, key, columns, chunks, selected):
+        # The hash of the rows in the selected chunks, by key
+        key, _, key_expr, row_expr = self._checksum_spec(key, columns)
+        source, binds = self._source()
+
+        cursor = self.db.plsql(
+            """
+            select {}, ora_hash({})
+            from   {}
+            where  ora_hash({}, :sibilla_buckets) in (
+                select column_value from table(:sibilla_chunks)
+            )
+            """.format(", ".join(key), row_expr, source, key_expr),
+            sibilla_buckets=chunks - 1,
+            sibilla_chunks=Collection(selected),
+            **binds
+        )
+
+        return {tuple(row[:-1]): row[-1] for row in cursor}
+
+    def compare(self, other, chunks=16, key=None, columns=None):
+        """Compare the table with another one.
+
+        The checksums of the two tables (see :func:`checksum`) are compared
+        first, and only the rows in the chunks that do not match are then
+        compared by the hash of their columns. The other table can be on a
+        different database, and must have the key and the columns of this
+        table.
+
+        Example:
+            >>> diff = source_db.orders.compare(target_db.orders)
+            >>> if diff.missing or diff.extra or diff.changed:
+            ...     print("Copy out of sync")
+
+        Args:
+            other (:class:`Table`): The table to compare with.
+            chunks (int): The number of chunks.
+            key (list): The columns that identify a row. Defaults to the
+                primary key of this table.
+            columns (list): The columns to compare. Defaults to all the
+                columns of this table.
+
+        Returns:
+            :class:`TableComparison`: the keys of the rows missing from the
+            other table, of those only in the other table, and of those that
+            differ.
+        """
+        key, columns, _, _ = self._checksum_spec(key, columns)
+
+        mine = self.checksum(chunks, key, columns)
+        theirs = other.checksum(chunks, key, columns)
+        selected = sorted(
+            c for c in set(mine) | set(theirs) if mine.get(c) != theirs.get(c)
+        )
+        if not selected:
+            return TableComparison([], [], [])
+
+        mine = self._row_hashes(key, columns, chunks, selected)
+        theirs = other._row_hashes(key, columns, chunks, selected)
+
+        return TableComparison(
+            sorted(k for k in mine if k not in theirs),
+            sorted(k for k in theirs if k not in mine),
+            sorted(k for k in mine if k in theirs and mine[k] != theirs[k]),
+        )
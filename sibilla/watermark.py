@@ -0,0 +1,183 @@
+# This file is part of "sibilla" which is released under GPL.
+#
+# See file LICENCE or go to http://www.gnu.org/licenses/ for full license
+# details.
+#
+# Sibilla is a Python ORM for the Oracle Database.
+#
+# Copyright (c) 2019 Gabriele N. Tornetta <phoenix1987@gmail.com>.
+# All rights reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import datetime
+import decimal
+import json
+import os
+import tempfile
+import threading
+
+from sibilla import DatabaseError
+
+
+# ---- Exceptions -------------------------------------------------------------
+
+
+class WatermarkError(DatabaseError):
+    """Watermark store error."""
+    pass
+
+
+# ---- Local helpers ----------------------------------------------------------
+
+
+# Formats of the encoded datetime and date watermarks
+_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+_DATE_FORMAT = "%Y-%m-%d"
+
+
+def _encode(value):
+    # Encode a watermark as a JSON value, preserving its type
+    if isinstance(value, datetime.datetime):
+        return {"datetime": value.strftime(_DATETIME_FORMAT)}
+    if isinstance(value, datetime.date):
+        return {"date": value.strftime(_DATE_FORMAT)}
+    if isinstance(value, decimal.Decimal):
+        return {"decimal": str(value)}
+    if value is None or isinstance(value, (int, float, str)):
+        return value
+
+    raise WatermarkError(
+        "Unsupported watermark type: {}".format(type(value).__name__)
+    )
+
+
+def _decode(value):
+    if not isinstance(value, dict):
+        return value
+
+    (kind, text), = value.items()
+    if kind == "datetime":
+        return datetime.datetime.strptime(text, _DATETIME_FORMAT)
+    if kind == "date":
+        return datetime.datetime.strptime(text, _DATE_FORMAT).date()
+
+    return decimal.Decimal(text)
+
+
+# ---- Classes ----------------------------------------------------------------
+
+
+class WatermarkStore:
+    """Persistent store of extraction watermarks.
+
+    Watermarks are kept in a JSON file on the local disk, by data source name,
+    schema and data set, so that repeated extractions with
+    :func:`sibilla.dataset.DataSet.changes_since` only transfer the rows
+    changed since the previous run.
+
+    Example:
+        >>> store = WatermarkStore("/var/lib/sync/watermarks.json")
+        >>> for row in store.changes(db.orders, column="updated_at"):
+        ...     sync(row)
+
+    The new watermark is saved only once all the changed rows have been
+    consumed, so that an interrupted extraction is repeated in full on the
+    next run.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(
+            os.path.expanduser("~"), ".sibilla", "watermarks.json"
+        )
+
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(dataset):
+        return "{}/{}.{}".format(
+            dataset.db.dsn,
+            dataset.__schema__ or dataset.db.username.upper(),
+            dataset.name
+        )
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            raise WatermarkError(
+                "Cannot read watermarks from {}: {}".format(self.path, e)
+            ) from e
+
+    def _save(self, watermarks):
+        # Replace the file atomically, so that it is never left corrupted.
+        # The temporary file is unique, as other processes can be saving
+        # to the same path.
+        directory = os.path.dirname(self.path) or "."
+        temp = None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, temp = tempfile.mkstemp(
+                dir=directory, prefix=os.path.basename(self.path) + ".",
+                suffix=".tmp"
+            )
+            with os.fdopen(fd, "w") as f:
+                json.dump(watermarks, f, indent=2, sort_keys=True)
+            os.replace(temp, self.path)
+        except OSError as e:
+            if temp is not None and os.path.exists(temp):
+                os.remove(temp)
+            raise WatermarkError(
+                "Cannot write watermarks to {}: {}".format(self.path, e)
+            ) from e
+
+    def get(self, dataset):
+        """Get the watermark of the given data set, if any."""
+        with self._lock:
+            return _decode(self._load().get(self._key(dataset)))
+
+    def set(self, dataset, watermark):
+        """Set the watermark of the given data set."""
+        with self._lock:
+            watermarks = self._load()
+            watermarks[self._key(dataset)] = _encode(watermark)
+            self._save(watermarks)
+
+    def reset(self, dataset):
+        """Discard the watermark of the given data set."""
+        with self._lock:
+            watermarks = self._load()
+            if watermarks.pop(self._key(dataset), None) is not None:
+                self._save(watermarks)
+
+    def changes(self, dataset, column=None, select="*"):
+        """Get the rows of the data set changed since the stored watermark.
+
+        See :func:`sibilla.dataset.DataSet.changes_since` for the arguments.
+        The new watermark is stored when the returned generator is exhausted.
+
+        Returns:
+            generator: the changed rows.
+        """
+        rows, watermark = dataset.changes_since(
+            self.get(dataset), column, select
+        )
+
+        def row_generator():
+            yield from rows
+            self.set(dataset, watermark)
+
+        return row_generator()
@@ -9,5 +9,6 @@ grant create procedure                            to g;
 grant create table                                to g;
 grant create sequence                             to g;
 grant change notification                         to g;
+grant execute on sys.dbms_flashback               to g;
 -- Requires documentation. See https://docs.oracle.com/database/121/ADFNS/adfns_cqn.htm#ADFNS018
 /
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from sibilla.aio import AsyncDatabase, AsyncDatabaseError
+from sibilla.pool import SessionPool
+
+USER = "g"
+PASSWORD = "g"
+
+
+class TestAsyncDatabase:
+
+    @classmethod
+    def setup_class(cls):
+        cls.pool = SessionPool(USER, PASSWORD, "XE", max=2)
+
+    def run(self, coro):
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(coro)
+        finally:
+            loop.close()
+
+    def test_fetch(self):
+        async def main():
+            async with AsyncDatabase(self.pool) as adb:
+                row = await adb.fetch_one("select 42 answer from dual")
+                assert row.answer == 42
+
+                rows = await adb.marks.fetch_all(module_code="CM0003")
+                assert len(rows) == 3
+
+                student = await adb.students.fetch_one(no="20060101")
+                assert student.surname == "Dickens"
+
+                n = 0
+                async for _ in adb.marks.afetch_all(batch_size=2):
+                    n += 1
+                assert n == len(await adb.marks.fetch_all())
+
+                with pytest.raises(AsyncDatabaseError):
+                    await adb.no_such_object.fetch_all()
+
+        self.run(main())
+
+    def test_callable(self):
+        async def main():
+            async with AsyncDatabase(self.pool) as adb:
+                assert await adb.dbms_output.enable() is None
+
+        self.run(main())
+
+    def test_timeout(self):
+        async def main():
+            async with AsyncDatabase(self.pool, timeout=0.5) as adb:
+                with pytest.raises(asyncio.TimeoutError):
+                    await adb.fetch_one("""
+                        select count(*)
+                        from   all_objects, all_objects, all_objects
+                    """)
+
+                # The cancelled session is replaced
+                for _ in range(4):
+                    row = await adb.fetch_one("select 1 n from dual")
+                    assert row.n == 1
+
+        self.run(main())
@@ -1,6 +1,9 @@
 from time import sleep
 
-from sibilla.caching import cachedmethod, Cached, set_ttl, set_maxsize
+from sibilla.caching import (
+    Cached, ResultCache, SynchronizedTTLCache, cachedmethod, set_maxsize,
+    set_ttl
+)
 
 
 TTL=1
@@ -53,3 +56,33 @@ class TestCached:
         set_maxsize(MAXSIZE)
 
         CachedClass().test_cached_method()
+
+    def test_maxsize(self):
+        set_maxsize(MAXSIZE)
+
+        assert SynchronizedTTLCache().maxsize == MAXSIZE
+        assert SynchronizedTTLCache(0).maxsize == 0
+
+
+class TestResultCache:
+    def test_eviction(self):
+        cache = ResultCache(maxsize=4096)
+        description = [("N",)]
+
+        for i in range(100):
+            cache.put("tab{}".format(i % 3), i, description, [(i,)])
+
+        assert cache.currsize <= 4096
+        assert cache.get(99) is not None
+        assert cache.get(0) is None
+
+        # Tags of evicted results are pruned
+        assert sum(len(keys) for keys in cache._tags.values()) \
+            == len(cache._cache)
+
+        cache.invalidate("tab0")
+        assert cache.get(99) is None
+        assert "tab0" not in cache._tags
+
+        cache.flush()
+        assert not cache._tags
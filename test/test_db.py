@@ -1,11 +1,16 @@
+import threading
+
 import pytest
 
 import cx_Oracle
+import sibilla
 
 from sibilla import ConnectionError, Database, LoginError, DatabaseError
-from sibilla import CursorRow, CursorRowError
+from sibilla import CallCancelledError, CallTimeoutError
+from sibilla import Collection, CursorRow, CursorRowError
 from sibilla import sql_identifier, IdentifierError
 from sibilla.dataset import DataSet, Row
+from sibilla.table import Table
 
 
 USER = "g"
@@ -140,3 +145,140 @@ class TestDB:
         assert isinstance(self.db.all_objects.fetch_all(), cx_Oracle.Cursor)
         assert isinstance(self.db.user_objects.fetch_many(2), list)
         assert isinstance(self.db.all_objects.fetch_one(), tuple)
+
+    def test_collection(self):
+        res = self.db.fetch_all("""
+            select procedure_name
+            from   all_procedures
+            where  object_name = :obj_name
+               and procedure_name in (select column_value from table(:names))
+        """, obj_name="DBMS_OUTPUT", names=Collection(["PUT_LINE", "ENABLE"]))
+        assert sorted(r.procedure_name for r in res) == ["ENABLE", "PUT_LINE"]
+
+        assert Collection([1, 2.5]).type_name == "SYS.ODCINUMBERLIST"
+
+        with pytest.raises(DatabaseError):
+            Collection([1, "a"]).type_name
+
+    def test_prefetch(self):
+        stmt = "select level n from dual connect by level <= :n"
+
+        assert [r.n for r in self.db.fetch_all(stmt, n=1000, prefetch=2)] \
+            == list(range(1, 1001))
+
+        rows = self.db.fetch_all(stmt, n=1000, prefetch=1)
+        assert next(rows).n == 1
+        rows.close()
+
+        with pytest.raises(DatabaseError):
+            list(self.db.fetch_all(
+                "select 1 / (level - 200) from dual connect by level <= 300",
+                prefetch=2
+            ))
+
+        assert len(list(self.db.marks.fetch_all(prefetch=2))) == len(
+            list(self.db.marks.fetch_all())
+        )
+
+    def test_fetch_size(self):
+        stmt = "select level n from dual connect by level <= :n"
+
+        cursor = self.db.plsql(stmt, n=10, arraysize=7, prefetchrows=3)
+        assert cursor.arraysize == 7
+        assert cursor.prefetchrows == 3
+
+        for prefetch in (None, 2):
+            assert [r.n for r in self.db.fetch_all(
+                stmt, n=5000, arraysize="auto", prefetch=prefetch
+            )] == list(range(1, 5001))
+
+        # The array size is set before the execution
+        with self.db.fetch_all(
+            stmt, n=10, arraysize="auto", cancellable=True
+        ) as rows:
+            assert rows._cursor.arraysize > 100
+            assert len(list(rows)) == 10
+
+        # The description of the statement is retrieved once
+        assert (self.db.dsn, self.db.username, stmt) in sibilla._row_widths
+
+        with self.db.fetch_all(
+            stmt, n=10, prefetchrows=5, cancellable=True
+        ) as rows:
+            assert rows._cursor.prefetchrows == 5
+            assert len(list(rows)) == 10
+
+        self.db.set_fetch_budget(1024)
+        try:
+            assert len(list(self.db.fetch_all(
+                stmt, n=100, arraysize="auto"
+            ))) == 100
+        finally:
+            self.db.set_fetch_budget(4 * 1024 * 1024)
+
+        Table.set_fetch_size(arraysize="auto", prefetchrows=10)
+        try:
+            assert len(list(self.db.marks.fetch_all())) == len(
+                list(self.db.marks.fetch_all(arraysize=2))
+            )
+        finally:
+            Table.set_fetch_size()
+
+    def test_call_timeout(self):
+        slow = "select count(*) n from all_objects, all_objects, all_objects"
+
+        with pytest.raises(CallTimeoutError):
+            self.db.fetch_one(slow, call_timeout=0.5)
+        assert self.db.callTimeout == 0
+
+        # The session is still usable
+        assert self.db.fetch_one("select 1 n from dual").n == 1
+
+        with self.db.call_timeout(0.5):
+            with pytest.raises(CallTimeoutError):
+                self.db.plsql(slow)
+        assert self.db.callTimeout == 0
+
+        self.db.set_call_timeout(0.5)
+        try:
+            with pytest.raises(CallTimeoutError):
+                list(self.db.fetch_all(slow))
+        finally:
+            self.db.set_call_timeout(None)
+        assert self.db.callTimeout == 0
+
+        Table.set_call_timeout(30)
+        try:
+            assert len(list(self.db.marks.fetch_all())) == len(
+                list(self.db.marks.fetch_all(call_timeout=10))
+            )
+        finally:
+            Table.set_call_timeout(None)
+
+    def test_cancel(self):
+        rows = self.db.fetch_all(
+            "select level n from dual connect by level <= 1000",
+            cancellable=True
+        )
+        assert next(rows).n == 1
+        rows.cancel()
+        assert rows.cancelled
+        with pytest.raises(CallCancelledError):
+            next(rows)
+
+        rows = self.db.fetch_all(
+            "select 1 n from all_objects, all_objects", cancellable=True
+        )
+        timer = threading.Timer(0.5, rows.cancel)
+        timer.start()
+        try:
+            with pytest.raises(CallCancelledError):
+                list(rows)
+        finally:
+            timer.cancel()
+
+        # The session is still usable
+        assert self.db.fetch_one("select 1 n from dual").n == 1
+
+        with self.db.marks.fetch_all(cancellable=True) as rows:
+            assert next(rows) is not None
@@ -0,0 +1,60 @@
+import pytest
+
+from sibilla import Database
+from sibilla.join import JoinError
+
+USER = "g"
+PASSWORD = "g"
+
+
+class TestJoin:
+
+    @classmethod
+    def setup_class(cls):
+        cls.db = Database(USER, PASSWORD, "XE", events=True)
+
+    def test_foreign_key(self):
+        db = self.db
+        rows = list(db.marks.join(db.students).fetch_all(
+            where=({"marks.module_code": "CM0003"},),
+            order_by="students.no"
+        ))
+
+        assert len(rows) == 3
+        for row in rows:
+            assert row.student_no == row.students.no == row["students.no"]
+            assert row.surname == row.students.surname
+
+        with pytest.raises(AttributeError):
+            rows[0].no_such_column
+
+    def test_chain(self):
+        db = self.db
+        join = db.marks.join(db.students).join(db.modules, how="left")
+
+        row = join.fetch_one(
+            select=["students.surname", "modules.name", "mark"],
+            module_code="CM0003"
+        )
+        assert set(dir(row)) == {"STUDENTS.SURNAME", "MODULES.NAME", "MARK"}
+        assert len(join.fetch_many(2)) == 2
+
+    def test_on(self):
+        db = self.db
+
+        assert len(list(db.marks.join(db.modules, on=("module_code", "code"))
+                        .fetch_all(module_code="CM0003"))) == 3
+
+        join = db.marks.join(db.modules, on=("module_code", "modules.code"))
+        row = join.fetch_one(
+            select=["marks.module_code", "upper(modules.name) upper_name"],
+            module_code="CM0003"
+        )
+        assert row["marks.module_code"] == "CM0003"
+        assert row.upper_name == row.upper_name.upper()
+
+        with pytest.raises(JoinError):
+            db.students.join(db.students)
+
+        with pytest.raises(JoinError):
+            db.marks.join(db.students, how="sideways")
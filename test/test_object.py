@@ -56,4 +56,4 @@ class TestObject:
 
     def test_unsupported_types(self):
         with pytest.raises(ObjectTypeError):
-            self.db.test_sequence
+            self.db.test_index
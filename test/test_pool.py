@@ -0,0 +1,95 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from sibilla.pool import LocalDatabase, SessionPool
+from sibilla.table import TableError
+
+USER = "g"
+PASSWORD = "g"
+
+
+class TestLocalDatabase:
+
+    @classmethod
+    def setup_class(cls):
+        cls.pool = SessionPool(USER, PASSWORD, "XE", max=4)
+
+    @classmethod
+    def teardown_class(cls):
+        cls.pool.close()
+
+    def test_threads(self):
+        db = self.pool.local_database()
+        assert isinstance(db, LocalDatabase)
+
+        def work(n):
+            try:
+                return (
+                    db.len("x" * n),
+                    db.callable_package.is_negative(-n),
+                    len(list(db.marks.fetch_all(module_code="CM0003"))),
+                )
+            finally:
+                db.release()
+
+        with ThreadPoolExecutor(4) as executor:
+            results = list(executor.map(work, range(1, 9)))
+
+        assert results == [(n, True, 3) for n in range(1, 9)]
+
+        # The looked-up objects are shared by the threads
+        assert db.marks is db.marks
+        assert db.marks.db is db
+
+    def test_session_per_thread(self):
+        db = self.pool.local_database()
+        try:
+            main = db.__db__
+            assert db.__db__ is main
+
+            with ThreadPoolExecutor(1) as executor:
+                other = executor.submit(lambda: db.__db__).result()
+            assert other is not main
+            assert other.__pool__ is self.pool
+        finally:
+            db.close()
+
+    def test_prepared_query(self):
+        db = self.pool.local_database()
+        q = db.marks.prepare(where=("module_code",))
+
+        def work(_):
+            try:
+                return len(q(module_code="CM0003")), db.__db__
+            finally:
+                db.release()
+
+        try:
+            with ThreadPoolExecutor(2) as executor:
+                results = list(executor.map(work, range(4)))
+
+            # Each execution runs on the session of its thread
+            assert [n for n, _ in results] == [3] * 4
+            assert all(q in session._prepared for _, session in results)
+        finally:
+            q.close()
+            db.close()
+
+    def test_row_caching(self):
+        db = self.pool.local_database()
+        try:
+            assert db.__shared__
+            assert db.students["20060101"] is not db.students["20060101"]
+
+            with pytest.raises(TableError):
+                db.students.cache_all()
+        finally:
+            db.close()
+
+    def test_session_setup(self):
+        with self.pool.session() as db:
+            assert db._default_lookup is None
+
+            db.plsql("begin dbms_output.put_line('pooled'); end;")
+            assert db.get_output() == "pooled\n"
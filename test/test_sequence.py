@@ -0,0 +1,57 @@
+import pytest
+
+from sibilla import Database
+from sibilla.sequence import Sequence, SequenceError
+
+USER = "g"
+PASSWORD = "g"
+
+
+class TestSequence:
+
+    @classmethod
+    def setup_class(cls):
+        cls.db = Database(USER, PASSWORD, "XE", events=True)
+
+        cls.db.plsql("create sequence block_seq start with 1 increment by 1")
+        cls.db.plsql("create table seq_keys(id number(9), name varchar(8))")
+
+    @classmethod
+    def teardown_class(cls):
+        cls.db.seq_keys.drop()
+        cls.db.plsql("drop sequence block_seq")
+
+    def test_base_class(self):
+        with pytest.raises(SequenceError):
+            Sequence(self.db)
+
+    def test_sequence(self):
+        seq = self.db.block_seq
+
+        assert repr(seq) == "<sequence 'BLOCK_SEQ'>"
+        assert seq.fetch(0) == []
+
+        first = next(seq)
+        assert seq.nextval == first + 1
+        assert seq.take(3) == [first + 2, first + 3, first + 4]
+
+        # Taking more values than buffered requires a new block
+        values = seq.take(Sequence.__block_size__)
+        assert values == list(range(first + 5, first + 5 + len(values)))
+
+        seq.flush()
+        assert next(seq) > values[-1]
+
+    def test_insert_with_sequence(self):
+        self.db.seq_keys.insert(
+            [{'name': n} for n in "abc"] + [{'name': 'd'}],
+            sequences={'id': self.db.block_seq},
+        )
+        self.db.seq_keys.insert(
+            (None, 'e'),
+            sequences={'id': self.db.block_seq},
+        )
+
+        ids = [row.id for row in self.db.seq_keys.fetch_all(order_by="id")]
+        assert len(set(ids)) == 5
+        assert None not in ids
@@ -0,0 +1,130 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from sibilla import Database
+from sibilla.dataset import RowAttributeError
+from sibilla.session import SessionError
+
+USER = "g"
+PASSWORD = "g"
+
+
+class TestSession:
+
+    @classmethod
+    def setup_class(cls):
+        cls.db = Database(USER, PASSWORD, "XE", events=True)
+
+        cls.db.plsql("""
+            create table uow_parent(
+                id   number(9),
+                name varchar(10),
+                constraint uow_parent#p primary key (id)
+            )
+        """)
+        cls.db.plsql("""
+            create table uow_child(
+                id        number(9),
+                parent_id number(9),
+                name      varchar(10),
+                constraint uow_child#p primary key (id),
+                constraint uow_child#f foreign key (parent_id)
+                    references uow_parent (id)
+            )
+        """)
+
+    @classmethod
+    def teardown_class(cls):
+        cls.db.uow_child.drop()
+        cls.db.uow_parent.drop()
+
+    def test_session(self):
+        with self.db.session() as session:
+            # Children are scheduled first, but parents are inserted first
+            session.insert(self.db.uow_child, [
+                {'id': i, 'parent_id': 1, 'name': 'c' + str(i)}
+                for i in range(3)
+            ])
+            session.insert(self.db.uow_parent, (1, 'parent'))
+
+        parent = self.db.uow_parent[1]
+        with self.db.session() as session:
+            parent.name = 'renamed'
+            assert parent.__changes__ == {'NAME': 'renamed'}
+            assert parent.name == 'renamed'
+
+            for child in self.db.uow_child.fetch_all():
+                child.name = child.name.upper()
+
+            session.delete(self.db.uow_child[2])
+
+        assert not parent.__changes__
+        assert self.db.uow_parent[1].name == 'renamed'
+        assert sorted(c.name for c in self.db.uow_child) == ['C0', 'C1']
+
+    def test_rollback(self):
+        row = self.db.uow_parent[1]
+
+        with pytest.raises(RuntimeError):
+            with self.db.session():
+                row.name = 'discarded'
+                raise RuntimeError()
+
+        assert row.name == 'renamed'
+
+        with pytest.raises(RowAttributeError):
+            row.no_such_column = 42
+
+        # Changes outside of a session would never be written
+        with pytest.raises(RowAttributeError):
+            row.name = 'lost'
+        assert not row.__changes__
+
+    def test_thread(self):
+        with self.db.session():
+            # The session is not active in other threads
+            with ThreadPoolExecutor(1) as executor:
+                assert executor.submit(
+                    lambda: self.db.__session__
+                ).result() is None
+
+    def test_session_errors(self):
+        self.db.plsql("create table uow_no_pk(id number(9))")
+        try:
+            self.db.uow_no_pk.insert((1,))
+
+            with pytest.raises(SessionError):
+                self.db.session().delete(self.db.uow_no_pk.fetch_one())
+
+            with pytest.raises(SessionError):
+                with self.db.session():
+                    self.db.uow_no_pk.fetch_one().id = 2
+        finally:
+            self.db.uow_no_pk.drop()
+
+    def test_failed_commit(self):
+        # A failed flush rolls back the changes written so far
+        with pytest.raises(Exception):
+            with self.db.session() as session:
+                session.insert(self.db.uow_parent, (2, 'parent'))
+                session.insert(self.db.uow_child, (10, 42, 'orphan'))
+
+        assert self.db.uow_parent.fetch_one(id=2) is None
+
+        self.db.plsql("create table uow_no_pk(id number(9))")
+        try:
+            self.db.uow_no_pk.insert((1,))
+            self.db.commit()
+
+            # Primary keys are validated before any change is written
+            parent = self.db.uow_parent[1]
+            with pytest.raises(SessionError):
+                with self.db.session():
+                    parent.name = 'unwritten'
+                    self.db.uow_no_pk.fetch_one().id = 2
+
+            assert not parent.__changes__
+            assert self.db.uow_parent[1].name == 'renamed'
+        finally:
+            self.db.uow_no_pk.drop()
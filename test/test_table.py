@@ -1,8 +1,13 @@
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 
 from sibilla import ConnectionError, Database, DatabaseError, LoginError
+from sibilla.caching import set_identity_map_size
 from sibilla.dataset import QueryError
 from sibilla.object import ObjectLookupError
+from sibilla.pool import SessionPool
 from sibilla.table import (PrimaryKeyError, Table, TableEntryError, TableError,
                            TableInsertError)
 
@@ -15,6 +20,7 @@ class TestTable:
     @classmethod
     def setup_class(cls):
         cls.db = Database(USER, PASSWORD, "XE", events=True)
+        cls.pool = SessionPool(USER, PASSWORD, "XE", max=4)
 
         cls.db.plsql("""
             create table test_slice(
@@ -26,6 +32,7 @@ class TestTable:
     @classmethod
     def teardown_class(cls):
         cls.db.test_slice.drop()
+        cls.pool.close()
 
     def test_base_class(self):
         with pytest.raises(TableError):
@@ -167,3 +174,458 @@ class TestTable:
         with pytest.raises(ObjectLookupError):
             self.db.drop_me.drop()
             self.db.drop_me
+
+    def test_direct_insert(self):
+        self.db.plsql("create table direct_load(id number(9), tag varchar(8))")
+
+        try:
+            with pytest.raises(TableInsertError):
+                self.db.direct_load.insert([(1, 'a')], nologging=True)
+
+            with pytest.raises(TableInsertError):
+                self.db.direct_load.insert([(1, 'a')], commit_every=0)
+
+            self.db.direct_load.insert(
+                [(i, 'n' + str(i)) for i in range(25)],
+                direct=True,
+                nologging=True,
+                commit_every=10,
+            )
+
+            # Direct-path loads are committed so the table can be read
+            assert len(list(self.db.direct_load)) == 25
+
+            self.db.direct_load.insert({'id': 25, 'tag': 'last'}, direct=True)
+            assert self.db.direct_load.fetch_one(id=25).tag == 'last'
+
+        finally:
+            self.db.direct_load.drop()
+
+    def test_insert_returning(self):
+        self.db.plsql("""
+            create table returning_ids(
+                id   number generated always as identity,
+                name varchar(10)
+            )
+        """)
+
+        try:
+            ids = self.db.returning_ids.insert(
+                [{'name': n} for n in "abcde"],
+                returning=["id"],
+                batch_size=2,
+            )
+            assert len(ids) == 5
+            assert [i for i, in ids] == sorted(i for i, in ids)
+
+            row = self.db.returning_ids.insert(
+                {'name': 'f'},
+                returning=["id"],
+                as_rows=True,
+            )
+            assert row.name == 'f'
+            assert row.id == ids[-1][0] + 1
+
+            with pytest.raises(TableInsertError):
+                self.db.returning_ids.insert(
+                    {'name': 'g'}, returning=["no_such_column"]
+                )
+
+        finally:
+            self.db.returning_ids.drop()
+
+    def test_identity_map(self):
+        students = self.db.students
+
+        student = students["20060105"]
+        assert students["20060105"] is student
+        assert students["20060104"] is not student
+
+        self.db.rollback()
+        assert students["20060105"] is not student
+
+        student = students["20060105"]
+        self.db.commit(flush_cache=False)
+        assert students["20060105"] is not student
+
+        set_identity_map_size(0)
+        try:
+            assert students["20060105"] is not students["20060105"]
+        finally:
+            set_identity_map_size(1024)
+
+    def test_cache_all(self):
+        modules = self.db.modules
+        modules.cache_all(indexes=["name"])
+
+        try:
+            assert modules["CM0004"].name == "Graphics"
+            assert modules.fetch_one(name="Graphics").code == "CM0004"
+            assert modules.fetch_one(name="No such module") is None
+            assert len(list(modules.fetch_all())) == len(list(
+                self.db.fetch_all("select * from modules")
+            ))
+
+            with pytest.raises(PrimaryKeyError):
+                modules["CM9999"]
+
+            # Non-equality conditions are still answered by the database
+            assert modules.fetch_one(name="Graph%").code == "CM0004"
+
+            # The rows of the in-memory copy are wrapped once
+            row = modules["CM0004"]
+            self.db.rollback()
+            assert modules["CM0004"] is row
+
+        finally:
+            modules.uncache_all()
+
+    def test_cache_all_types(self):
+        db = self.db
+        db.plsql("create table test_cache_types(code char(4), day date)")
+        try:
+            db.plsql(
+                "insert into test_cache_types values ('AB', date '2020-01-02')"
+            )
+            table = db.test_cache_types
+
+            def counts():
+                return (
+                    len(list(table.fetch_all(code="AB"))),
+                    len(list(table.fetch_all(day=datetime.date(2020, 1, 2)))),
+                )
+
+            expected = counts()
+            table.cache_all(indexes=["code", "day"])
+            try:
+                assert counts() == expected
+            finally:
+                table.uncache_all()
+        finally:
+            db.rollback()
+            db.test_cache_types.drop()
+
+    def test_result_cache(self):
+        class CachedTable(Table):
+            __result_cache__ = True
+
+        marks = CachedTable(self.db, "marks")
+        self.db.result_cache.flush()
+
+        first = list(marks.fetch_all(module_code="CM0003"))
+        assert self.db.result_cache.currsize > 0
+
+        second = list(marks.fetch_all(module_code="CM0003"))
+        assert [r.mark for r in first] == [r.mark for r in second]
+        assert marks.fetch_one(module_code="CM0003").mark == first[0].mark
+
+        self.db.commit(flush_cache=False)
+        assert self.db.result_cache.currsize == 0
+
+    def test_where_operators(self):
+        marks = self.db.marks
+
+        assert len(list(marks.fetch_all(module_code__in=["CM0003"]))) == 3
+        assert len(list(marks.fetch_all(module_code__ne="CM0003"))) == len(
+            list(marks.fetch_all())
+        ) - 3
+        assert not list(marks.fetch_all(module_code__in=[]))
+        assert len(list(marks.fetch_all(
+            module_code=["CM0003"] + ["XX" + str(i) for i in range(40000)]
+        ))) == 3
+        assert not list(marks.fetch_all(module_code__isnull=True))
+
+        assert all(
+            40 <= row.mark <= 60
+            for row in marks.fetch_all(mark__between=(40, 60))
+        )
+        assert all(
+            row.mark > 50 for row in marks.fetch_all(where=(
+                {'mark__gt': 50, 'student_no__like': '2006%'},
+            ))
+        )
+
+        with pytest.raises(QueryError):
+            marks.fetch_all(mark__between=40)
+
+    def test_statement_cache(self):
+        marks = self.db.marks
+
+        first, first_binds = marks._prepare_fetch(
+            "*", None, None, {'mark__gt': 10, 'module_code': ['CM0003']}
+        )
+        second, second_binds = marks._prepare_fetch(
+            "*", None, None, {'mark__gt': 20, 'module_code': ['CM0001', 'X']}
+        )
+
+        assert first is second
+        assert first_binds.keys() == second_binds.keys()
+        assert first_binds != second_binds
+
+    def test_prepare(self):
+        marks = self.db.marks
+
+        q = marks.prepare(
+            select=["student_no", "mark"],
+            where=(("module_code",), ["mark__gt", "student_no__in"]),
+            order_by="mark"
+        )
+
+        rows = q(module_code="CM0003", mark__gt=50, student_no__in=[])
+        assert all(row.mark > 50 for row in rows)
+        assert [row.mark for row in rows] == sorted(row.mark for row in rows)
+        assert q.one(module_code="XX", mark__gt=0, student_no__in=[]) is None
+
+        assert [len(rows) for rows in q.many([
+            {'module_code': "CM0003", 'mark__gt': 0, 'student_no__in': []},
+            {'module_code': "XX", 'mark__gt': 0, 'student_no__in': []},
+        ])] == [3, 0]
+
+        with pytest.raises(QueryError):
+            q(module_code="CM0003")
+
+        with pytest.raises(QueryError):
+            marks.prepare(where=("mark__isnull",))
+
+        q.close()
+        assert not self.db._prepared
+
+        with marks.prepare(where=("module_code",)) as q:
+            assert len(q(module_code="CM0003")) == 3
+        assert not self.db._prepared
+
+    def test_aggregate(self):
+        marks = self.db.marks
+
+        assert marks.count() == len(list(marks.fetch_all()))
+        assert marks.count(module_code="CM0003") == 3
+        assert marks.exists(module_code="CM0003")
+        assert not marks.exists(module_code="XX")
+
+        rows = marks.aggregate(
+            group_by=["module_code"], sum=["mark"], max=["mark"],
+            count=["student_no"]
+        )
+        assert [row.module_code for row in rows] == sorted(
+            {row.module_code for row in marks.fetch_all()}
+        )
+
+        row, = marks.aggregate(sum=["mark"], module_code="CM0003")
+        assert row.sum_mark == sum(
+            r.mark for r in marks.fetch_all(module_code="CM0003")
+        )
+
+        with pytest.raises(QueryError):
+            marks.aggregate(group_by=[])
+
+    def test_deferred(self):
+        class Students(Table):
+            __table__ = "students"
+
+        Students.set_deferred("forename")
+        students = Students(self.db)
+
+        assert students._projection("*") == ["NO", "SURNAME"]
+        assert students._projection(["surname"]) == ["surname"]
+
+        rows = list(students.fetch_all(order_by="no"))
+        assert all("FORENAME" not in row._get_record()._state for row in rows)
+        assert rows[0].forename == "Charles"
+        assert all("FORENAME" in row._get_record()._state for row in rows)
+        assert [row.forename for row in rows] == [
+            row.forename for row in self.db.students.fetch_all(order_by="no")
+        ]
+
+        Students.set_deferred()
+        Students.set_columns("surname")
+        assert students._projection("*") == ["NO", "SURNAME"]
+        row, = students.fetch_many(1, no="20060101")
+        assert row.forename == "Charles"
+
+    def test_parallel_scan(self):
+        with pytest.raises(TableError):
+            self.db.marks.parallel_scan()
+
+        def key(row):
+            return row.student_no, row.module_code, str(row.mark)
+
+        pool = self.pool
+        expected = sorted(key(row) for row in self.db.marks.fetch_all())
+
+        for split in ("rowid", "hash"):
+            for ordered in (False, True):
+                assert sorted(
+                    key(row) for row in self.db.marks.parallel_scan(
+                        workers=3, split=split, ordered=ordered, pool=pool
+                    )
+                ) == expected
+
+        assert len(list(self.db.marks.parallel_scan(
+            workers=2, pool=pool, module_code="CM0003"
+        ))) == 3
+
+        with pytest.raises(TableError):
+            list(self.db.marks.parallel_scan(split="partition", pool=pool))
+
+        with pool.session() as db:
+            assert db.__pool__ is pool
+            assert len(list(db.marks.parallel_scan(workers=2))) == len(
+                expected
+            )
+
+    def test_snapshot(self):
+        db = self.db
+        db.plsql("create table test_snapshot(id number(9))")
+        try:
+            db.test_snapshot.insert([{'id': 1}])
+            db.commit()
+
+            with db.snapshot() as scn:
+                assert db.__snapshot__ == scn
+                db.test_snapshot.insert([{'id': 2}])
+                db.commit()
+
+                assert db.test_snapshot.count() == 1
+                assert [row.id for row in db.test_snapshot.fetch_all()] == [1]
+
+            assert db.__snapshot__ is None
+            assert db.test_snapshot.count() == 2
+
+            with db.snapshot(scn):
+                assert db.test_snapshot.count() == 1
+
+                # Other threads and sessions are not affected
+                with ThreadPoolExecutor(1) as executor:
+                    assert executor.submit(
+                        lambda: (db.__snapshot__, db.test_snapshot.count())
+                    ).result() == (None, 2)
+
+                with self.pool.session() as other:
+                    assert other.__snapshot__ is None
+                    assert other.test_snapshot.count() == 2
+
+            assert len(list(db.test_snapshot.parallel_scan(
+                workers=2, pool=self.pool, scn=scn
+            ))) == 1
+        finally:
+            db.test_snapshot.drop()
+
+        # Rows read by primary key within a snapshot are not cached
+        db.plsql("""
+            create table test_snapshot_pk(
+                id   number(9),
+                name varchar2(10),
+                constraint test_snapshot_pk#p primary key (id)
+            )
+        """)
+        try:
+            db.test_snapshot_pk.insert((1, 'old'))
+            db.commit()
+
+            with db.snapshot() as scn:
+                pass
+
+            db.plsql("update test_snapshot_pk set name = 'new' where id = 1")
+            db.commit()
+
+            with db.snapshot(scn):
+                assert db.test_snapshot_pk[1].name == 'old'
+            assert db.test_snapshot_pk[1].name == 'new'
+            with db.snapshot(scn):
+                assert db.test_snapshot_pk[1].name == 'old'
+        finally:
+            db.test_snapshot_pk.drop()
+
+    def test_compare(self):
+        db = self.db
+        key = ["student_no", "module_code"]
+
+        db.plsql("create table test_marks_copy as select * from marks")
+        try:
+            copy = db.test_marks_copy
+
+            assert db.marks.checksum(4, key) == copy.checksum(4, key)
+            assert db.marks.compare(copy, 4, key) == ([], [], [])
+
+            db.plsql("""
+                update test_marks_copy
+                set    mark = mark + 1
+                where  module_code = 'CM0003'
+                   and rownum = 1
+            """)
+            db.plsql("delete from test_marks_copy where module_code = 'CM0001'")
+
+            diff = db.marks.compare(copy, 4, key)
+            assert len(diff.changed) == 1
+            assert diff.changed[0][1] == "CM0003"
+            assert diff.missing and all(k[1] == "CM0001" for k in diff.missing)
+            assert not diff.extra
+
+            with pytest.raises(TableError):
+                db.marks.checksum()
+        finally:
+            db.rollback()
+            db.test_marks_copy.drop()
+
+        # Times of day and NLS settings are taken into account
+        date_format = db.fetch_one(
+            "select value from nls_session_parameters "
+            "where parameter = 'NLS_DATE_FORMAT'"
+        ).value
+        db.plsql(
+            "create table test_dates(id number(9) primary key, d date)"
+        )
+        db.plsql(
+            "create table test_dates_copy(id number(9) primary key, d date)"
+        )
+        try:
+            db.plsql(
+                "insert into test_dates values (1, date '2020-01-01')"
+            )
+            db.plsql(
+                "insert into test_dates_copy "
+                "values (1, date '2020-01-01' + 1 / 24)"
+            )
+            db.plsql("alter session set nls_date_format = 'DD-MON-RR'")
+
+            assert db.test_dates.compare(db.test_dates_copy).changed == [(1,)]
+        finally:
+            db.rollback()
+            db.plsql(
+                "alter session set nls_date_format = '{}'".format(date_format)
+            )
+            db.test_dates.drop()
+            db.test_dates_copy.drop()
+
+    def test_copy_to(self):
+        db = self.db
+
+        db.plsql(
+            "create table test_marks_target as select * from marks where 1=0"
+        )
+        try:
+            with self.pool.session() as other:
+                target = other.test_marks_target
+
+                assert db.marks.copy_to(target, batch_size=2) \
+                    == db.marks.count()
+                assert target.count() == db.marks.count()
+
+                target.truncate()
+                assert db.marks.copy_to(
+                    target,
+                    transform=lambda row: row if row[1] == "CM0003" else None
+                ) == 3
+                assert target.count(module_code="CM0003") == 3
+                other.rollback()
+
+            # On the same session, the batches are copied synchronously
+            assert db.marks.copy_to(db.test_marks_target, batch_size=2) \
+                == db.marks.count()
+            assert db.test_marks_target.count() == db.marks.count()
+
+            with pytest.raises(QueryError):
+                db.marks.copy_to(db.test_marks_target, workers=2)
+        finally:
+            db.rollback()
+            db.test_marks_target.drop()
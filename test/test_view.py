@@ -1,6 +1,7 @@
 import pytest
 
 from sibilla import Database
+from sibilla.dataset import Hint, QueryError
 from sibilla.view import ViewError, View
 
 USER = "g"
@@ -24,3 +25,25 @@ class TestView:
     def test_base_class(self):
         with pytest.raises(ViewError):
             View(self.db)
+
+    def test_hints(self):
+        class CachedView(View):
+            __hints__ = [Hint.RESULT_CACHE]
+
+        view = CachedView(self.db, "user_objects")
+
+        assert view.fetch_one(
+            hints=[Hint.first_rows(1), Hint.parallel(2)],
+            object_name="CALLABLE_PACKAGE",
+            object_type="PACKAGE"
+        ).object_name == "CALLABLE_PACKAGE"
+
+        # Literal braces in hints are left alone
+        assert view.fetch_one(
+            hints=["OPT_PARAM('_fix_control' '{0}')"],
+            object_name="CALLABLE_PACKAGE",
+            object_type="PACKAGE"
+        ).object_name == "CALLABLE_PACKAGE"
+
+        with pytest.raises(QueryError):
+            view.fetch_one(hints=["FIRST_ROWS(1) */ 1, /*"])
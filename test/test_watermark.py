@@ -0,0 +1,78 @@
+import datetime
+
+import pytest
+
+from sibilla import Database
+from sibilla.watermark import WatermarkError, WatermarkStore
+
+USER = "g"
+PASSWORD = "g"
+
+
+class TestWatermark:
+
+    @classmethod
+    def setup_class(cls):
+        cls.db = Database(USER, PASSWORD, "XE", events=True)
+
+        cls.db.plsql("""
+            create table test_changes(
+                id      number(9),
+                version number(9)
+            ) rowdependencies
+        """)
+        cls.db.test_changes.insert([
+            {'id': 1, 'version': 1},
+            {'id': 2, 'version': 2},
+        ])
+        cls.db.commit()
+
+    @classmethod
+    def teardown_class(cls):
+        cls.db.test_changes.drop()
+
+    def test_changes_since_column(self):
+        table = self.db.test_changes
+
+        rows, watermark = table.changes_since(column="version")
+        assert sorted(row.id for row in rows) == [1, 2]
+        assert watermark == 2
+
+        rows, watermark = table.changes_since(1, column="version")
+        assert [row.id for row in rows] == [2]
+
+        rows, same = table.changes_since(watermark, column="version")
+        assert not list(rows)
+        assert same == watermark
+
+    def test_changes_since_rowscn(self):
+        table = self.db.test_changes
+
+        rows, scn = table.changes_since()
+        assert len(list(rows)) == 2
+
+        rows, _ = table.changes_since(scn)
+        assert not list(rows)
+
+    def test_store(self, tmp_path):
+        store = WatermarkStore(str(tmp_path / "watermarks.json"))
+        table = self.db.test_changes
+
+        assert store.get(table) is None
+        assert len(list(store.changes(table, column="version"))) == 2
+        assert store.get(table) == 2
+        assert not list(store.changes(table, column="version"))
+
+        now = datetime.datetime(2020, 1, 1, 12, 30)
+        store.set(table, now)
+        assert WatermarkStore(store.path).get(table) == now
+        assert [p.name for p in tmp_path.iterdir()] == ["watermarks.json"]
+
+        # Watermarks are kept by schema
+        assert "/{}.".format(USER.upper()) in store._key(table)
+
+        store.reset(table)
+        assert store.get(table) is None
+
+        with pytest.raises(WatermarkError):
+            store.set(table, object())
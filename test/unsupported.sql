@@ -1,3 +1,5 @@
+drop index test_index;
+
 drop sequence test_sequence;
 
 create sequence test_sequence
@@ -6,3 +8,5 @@ create sequence test_sequence
   start with 0
   increment by 1
 ;
+
+create index test_index on marks (mark);